@@ -0,0 +1,181 @@
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.module_loading import import_string
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+User = get_user_model()
+
+USER_KEY = 'auth:user:{user_id}'
+# Поля пользователя, которые несет токен и хранит кэш.
+CLAIM_FIELDS = ('username', 'role', 'is_superuser')
+USER_FIELDS = ('id', 'is_active') + CLAIM_FIELDS
+
+
+def get_user_cache():
+    return caches[settings.AUTH_USER_CACHE]
+
+
+class SQLiteRevocationStore:
+    """Отметки изменения пользователей в файле SQLite, общем для воркеров.
+
+    Запись не вытесняется до истечения срока, истекшие записи удаляются
+    раз в `PURGE_EVERY` записей, поэтому файл не растет без предела.
+    Основная БД проекта не затрагивается.
+    """
+
+    CREATE_SQL = ('CREATE TABLE IF NOT EXISTS revocation ('
+                  'user_id INTEGER PRIMARY KEY, changed REAL NOT NULL, '
+                  'expires REAL NOT NULL)')
+    SELECT_SQL = ('SELECT changed FROM revocation '
+                  'WHERE user_id = ? AND expires > ?')
+    UPSERT_SQL = ('INSERT OR REPLACE INTO revocation '
+                  '(user_id, changed, expires) VALUES (?, ?, ?)')
+    PURGE_SQL = 'DELETE FROM revocation WHERE expires <= ?'
+    # Как часто (в записях) удалять истекшие отметки.
+    PURGE_EVERY = 100
+
+    def __init__(self, path, timeout=5):
+        self.path = str(path)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def get_connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout,
+                                         isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(self.CREATE_SQL)
+            self._local.connection = connection
+            self._local.calls = 0
+        return connection
+
+    def get(self, user_id, now):
+        row = self.get_connection().execute(
+            self.SELECT_SQL, (user_id, now)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, user_id, changed, expires):
+        connection = self.get_connection()
+        self._local.calls += 1
+        connection.execute(self.UPSERT_SQL, (user_id, changed, expires))
+        if self._local.calls % self.PURGE_EVERY == 0:
+            connection.execute(self.PURGE_SQL, (changed,))
+
+    def clear(self):
+        self.get_connection().execute('DELETE FROM revocation')
+
+
+@lru_cache(maxsize=None)
+def get_revocation_store():
+    config = settings.AUTH_REVOCATION_STORE
+    return import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+
+
+def get_changed(user_id):
+    """Время последнего изменения пользователя (timestamp) или None."""
+    return get_revocation_store().get(user_id, time.time())
+
+
+def get_access_token(user):
+    """Access-токен с ролью, именем и признаком суперпользователя."""
+    token = AccessToken.for_user(user)
+    for field in CLAIM_FIELDS:
+        token[field] = getattr(user, field)
+    return token
+
+
+def invalidate_user(user_id):
+    """Помечает старые токены и кэш пользователя устаревшими.
+
+    Отметка пишется в `AUTH_REVOCATION_STORE` - общее для воркеров
+    хранилище без вытеснения - и живет не дольше access-токена.
+    """
+    get_user_cache().delete(USER_KEY.format(user_id=user_id))
+    now = time.time()
+    get_revocation_store().set(
+        user_id, now, now + api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    )
+
+
+def build_user(values):
+    """Пользователь с загруженными только полями `USER_FIELDS`.
+
+    Остальные поля отложены (deferred): обращение к ним загрузит их
+    из БД, а `save()` обновит только известные поля.
+    """
+    field_names = [field.attname for field in User._meta.concrete_fields
+                   if field.attname in values]
+    # Значения - из токена или основной БД (см. `load_values`).
+    return User.from_db(DEFAULT_DB_ALIAS, field_names,
+                        [values[name] for name in field_names])
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без запроса к БД.
+
+    Пользователь строится из claims токена (см. `get_access_token`).
+    Если claims нет или токен выпущен до изменения пользователя
+    (отметка `invalidate_user`), пользователь читается из БД, поэтому
+    роль, права и блокировка из старого токена не действуют. Результат
+    хранится в кэше `AUTH_USER_CACHE` (LRU, свой у воркера); запись
+    старше отметки изменения не используется.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Токен не содержит идентификатор '
+                               'пользователя.')
+        changed = get_changed(user_id)
+        cache = get_user_cache()
+        key = USER_KEY.format(user_id=user_id)
+        values = cache.get(key)
+        if values is None or (changed is not None
+                              and values['cached_at'] <= changed):
+            # Время до чтения БД: изменение, зафиксированное во время
+            # чтения, сделает запись устаревшей.
+            started = time.time()
+            values = (self.get_claims(validated_token, user_id, changed)
+                      or self.load_values(user_id))
+            values['cached_at'] = started
+            cache.set(key, values)
+        return build_user(values)
+
+    @staticmethod
+    def get_claims(validated_token, user_id, changed):
+        if any(field not in validated_token for field in CLAIM_FIELDS):
+            return None
+        if changed is not None and validated_token.get('iat', 0) <= changed:
+            return None
+        values = {field: validated_token[field] for field in CLAIM_FIELDS}
+        values.update(id=user_id, is_active=True)
+        return values
+
+    @staticmethod
+    def load_values(user_id):
+        # Результат попадает в кэш: реплика может отставать от
+        # изменения роли или блокировки, поэтому читаем основную БД.
+        values = (User.objects.using(DEFAULT_DB_ALIAS).filter(pk=user_id)
+                  .values(*USER_FIELDS).first())
+        if values is None:
+            raise AuthenticationFailed('Пользователь не найден.',
+                                       code='user_not_found')
+        if not values['is_active']:
+            raise AuthenticationFailed('Пользователь неактивен.',
+                                       code='user_inactive')
+        return values
@@ -0,0 +1,153 @@
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.status import HTTP_201_CREATED, HTTP_400_BAD_REQUEST
+
+from api.cache import bump_version
+from api.serializers import CommentBatchSerializer, ReviewBatchSerializer
+from reviews.models import Comment, Review, Title
+
+# Предел элементов: id пакета укладываются в один запрос IN (...).
+MAX_BATCH_SIZE = 500
+# Сколько раз сохранять пакет отзывов при конфликтах с параллельными
+# запросами.
+SAVE_ATTEMPTS = 3
+
+
+def error(errors):
+    return {'status': HTTP_400_BAD_REQUEST, 'errors': errors}
+
+
+def validate_items(serializer_class, items):
+    """Проверяет поля элементов без запросов к БД.
+
+    Возвращает список результатов (None для прошедших проверку)
+    и пары (индекс, validated_data).
+    """
+    if not isinstance(items, list):
+        raise ValidationError('Ожидается список объектов.')
+    if len(items) > MAX_BATCH_SIZE:
+        raise ValidationError(
+            f'В пакете не больше {MAX_BATCH_SIZE} объектов.'
+        )
+    results, valid = [], []
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+            results.append(None)
+        else:
+            results.append(error(serializer.errors))
+    return results, valid
+
+
+def save_objects(model, author, objects):
+    """bulk_create в текущей транзакции с заполнением id.
+
+    Если БД не возвращает id из bulk_create (SQLite), они читаются
+    одним запросом: последние строки автора, вставленные этой
+    транзакцией, идут в порядке вставки.
+    """
+    model.objects.bulk_create(objects)
+    if objects[0].pk is None:
+        ids = (model.objects.filter(author=author).order_by('-id')
+               .values_list('id', flat=True)[:len(objects)])
+        for obj, pk in zip(objects, reversed(ids)):
+            obj.pk = pk
+
+
+def check_reviews(author, pending, results):
+    """Отбирает элементы, для которых можно создать отзыв.
+
+    Произведения и уже оставленные автором отзывы проверяются двумя
+    запросами на весь пакет, отклоненным элементам пишется ошибка.
+    """
+    title_ids = {data['title_id'] for _, data in pending}
+    titles = set(Title.objects.filter(pk__in=title_ids)
+                 .values_list('pk', flat=True))
+    reviewed = set(Review.objects.filter(author=author, title_id__in=titles)
+                   .values_list('title_id', flat=True))
+    accepted = []
+    for index, data in pending:
+        if data['title_id'] not in titles:
+            results[index] = error({'title': ['Произведение не найдено.']})
+        elif data['title_id'] in reviewed:
+            results[index] = error(
+                {'non_field_errors': ['Review already exists']}
+            )
+        else:
+            reviewed.add(data['title_id'])
+            accepted.append((index, data))
+    return accepted
+
+
+def save_reviews(author, reviews):
+    """Сохраняет отзывы и пересчитывает рейтинг раз на произведение."""
+    if not reviews:
+        return
+    ratings = defaultdict(lambda: [0, 0])
+    for review in reviews:
+        ratings[review.title_id][0] += review.score
+        ratings[review.title_id][1] += 1
+    with transaction.atomic():
+        save_objects(Review, author, reviews)
+        for title_id, (score_sum, count) in ratings.items():
+            Title(pk=title_id).update_rating(score_sum, count)
+        transaction.on_commit(lambda: bump_version(Review))
+
+
+def create_reviews(author, items):
+    """Создает отзывы пакетом с результатом для каждого элемента.
+
+    Если параллельный запрос успел создать отзыв на то же произведение
+    (или удалить произведение), транзакция откатывается, элементы
+    проверяются заново, и оставшиеся сохраняются повторно.
+    """
+    results, pending = validate_items(ReviewBatchSerializer, items)
+    created = []
+    for _ in range(SAVE_ATTEMPTS):
+        accepted = check_reviews(author, pending, results)
+        reviews = [Review(author=author, **data) for _, data in accepted]
+        try:
+            save_reviews(author, reviews)
+        except IntegrityError:
+            pending = accepted
+            continue
+        created = [(index, review)
+                   for (index, _), review in zip(accepted, reviews)]
+        break
+    else:
+        for index, _ in pending:
+            results[index] = error(
+                {'non_field_errors': ['Review already exists']}
+            )
+    return fill_results(results, created, ReviewBatchSerializer)
+
+
+def create_comments(author, items):
+    """Создает комментарии пакетом; отзывы проверяются одним запросом."""
+    results, valid = validate_items(CommentBatchSerializer, items)
+    reviews = set(Review.objects
+                  .filter(pk__in={data['review_id'] for _, data in valid})
+                  .values_list('pk', flat=True))
+    created = []
+    for index, data in valid:
+        if data['review_id'] in reviews:
+            created.append((index, Comment(author=author, **data)))
+        else:
+            results[index] = error({'review': ['Отзыв не найден.']})
+
+    if created:
+        with transaction.atomic():
+            save_objects(Comment, author,
+                         [comment for _, comment in created])
+            transaction.on_commit(lambda: bump_version(Comment))
+    return fill_results(results, created, CommentBatchSerializer)
+
+
+def fill_results(results, created, serializer_class):
+    for index, obj in created:
+        results[index] = {'status': HTTP_201_CREATED,
+                          'data': serializer_class(obj).data}
+    return results
@@ -0,0 +1,111 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.http import quote_etag, urlencode
+
+VERSION_KEY = 'api:version:{label}'
+MODIFIED_KEY = 'api:modified:{label}'
+RESPONSE_KEY = 'api:response:{digest}'
+
+
+def get_cache():
+    return caches[settings.API_RESPONSE_CACHE]
+
+
+def new_version():
+    # Уникальное начальное значение: после вытеснения счетчика из кэша
+    # старые записи не совпадут с новой версией.
+    return time.time_ns()
+
+
+def get_counters(template, models, default):
+    """Значения счетчиков моделей; отсутствующие создаются."""
+    cache = get_cache()
+    keys = [template.format(label=model._meta.label_lower)
+            for model in models]
+    values = cache.get_many(keys)
+    for key in keys:
+        if key not in values:
+            cache.add(key, default(), None)
+            values[key] = cache.get(key)
+    return [values[key] for key in keys]
+
+
+def get_versions(models):
+    """Текущие версии моделей."""
+    return tuple(get_counters(VERSION_KEY, models, new_version))
+
+
+def get_last_modified(models):
+    """Время последнего изменения моделей (timestamp) или None."""
+    return max(get_counters(MODIFIED_KEY, models, time.time), default=None)
+
+
+def bump_version(model):
+    """Меняет версию модели, делая устаревшими зависимые ответы.
+
+    Новое значение, а не incr: в общих бэкендах incr - чтение и запись,
+    и два процесса могли бы записать одну и ту же версию.
+    """
+    cache = get_cache()
+    cache.set(VERSION_KEY.format(label=model._meta.label_lower),
+              new_version(), None)
+    cache.set(MODIFIED_KEY.format(label=model._meta.label_lower),
+              time.time(), None)
+
+
+def get_request_digest(request):
+    """Хэш схемы, хоста, пути, формата и отсортированных параметров."""
+    params = sorted(
+        (key, value)
+        for key in request.query_params
+        for value in request.query_params.getlist(key)
+    )
+    raw = '|'.join((
+        request.scheme,
+        request.get_host(),
+        request.path,
+        request.accepted_renderer.format,
+        urlencode(params),
+    ))
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def get_etag(request, versions):
+    """ETag ответа: запрос плюс версии моделей, без обращения к БД."""
+    raw = f'{get_request_digest(request)}|{versions}'
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def get_cached_response(request, versions, handler, *args, **kwargs):
+    """Отдает ответ из кэша или вызывает обработчик и кэширует результат.
+
+    `versions` читаются до запроса к БД, поэтому любая запись,
+    зафиксированная позже, делает сохраненный ответ устаревшим.
+    """
+    cache = get_cache()
+    key = RESPONSE_KEY.format(digest=get_request_digest(request))
+    entry = cache.get(key)
+    if entry is not None and entry[0] == versions:
+        _, status, content_type, content = entry
+        response = HttpResponse(content, status=status,
+                                content_type=content_type)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    response = handler(request, *args, **kwargs)
+    if response.streaming:
+        return response
+
+    def store(rendered):
+        if rendered.status_code == 200:
+            cache.set(key, (versions, rendered.status_code,
+                            rendered['Content-Type'], rendered.content),
+                      settings.API_RESPONSE_CACHE_TIMEOUT)
+        rendered['X-Cache'] = 'MISS'
+
+    response.add_post_render_callback(store)
+    return response
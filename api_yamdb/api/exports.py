@@ -0,0 +1,106 @@
+import csv
+import json
+from itertools import groupby, islice
+
+from reviews.models import Comment, Review, Title
+
+EXPORT_CHUNK_SIZE = 2000
+
+TitleGenre = Title.genre.through
+
+
+class Echo:
+    """Псевдофайл для csv.writer: возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def prepare(value):
+    return value.isoformat() if hasattr(value, 'isoformat') else value
+
+
+def iter_values(queryset, columns):
+    """Строки выгрузки как словари без создания моделей."""
+    names = list(columns)
+    for row in queryset.values_list(*columns.values()).iterator(
+            chunk_size=EXPORT_CHUNK_SIZE):
+        yield dict(zip(names, map(prepare, row)))
+
+
+def iter_titles():
+    """Произведения с жанрами: жанры подгружаются на каждую пачку строк."""
+    rows = iter_values(
+        Title.objects.order_by('id'),
+        {'id': 'id', 'name': 'name', 'year': 'year',
+         'description': 'description', 'category': 'category__slug',
+         'rating_sum': 'rating_sum', 'rating_count': 'rating_count'}
+    )
+    while True:
+        chunk = list(islice(rows, EXPORT_CHUNK_SIZE))
+        if not chunk:
+            return
+        links = (TitleGenre.objects
+                 .filter(title_id__in=[row['id'] for row in chunk])
+                 .order_by('title_id', 'genre__slug')
+                 .values_list('title_id', 'genre__slug'))
+        genres = {
+            title_id: [slug for _, slug in group]
+            for title_id, group in groupby(links, key=lambda link: link[0])
+        }
+        for row in chunk:
+            rating_sum = row.pop('rating_sum')
+            rating_count = row.pop('rating_count')
+            row['genre'] = genres.get(row['id'], [])
+            row['rating'] = (rating_sum / rating_count
+                             if rating_count else None)
+            yield row
+
+
+def iter_reviews():
+    return iter_values(
+        Review.objects.order_by('id'),
+        {'id': 'id', 'title': 'title_id', 'author': 'author__username',
+         'text': 'text', 'score': 'score', 'pub_date': 'pub_date'}
+    )
+
+
+def iter_comments():
+    return iter_values(
+        Comment.objects.order_by('id'),
+        {'id': 'id', 'title': 'review__title_id', 'review': 'review_id',
+         'author': 'author__username', 'text': 'text',
+         'pub_date': 'pub_date'}
+    )
+
+
+EXPORTS = {
+    'titles': (iter_titles, ('id', 'name', 'year', 'description',
+                             'genre', 'category', 'rating')),
+    'reviews': (iter_reviews, ('id', 'title', 'author', 'text', 'score',
+                               'pub_date')),
+    'comments': (iter_comments, ('id', 'title', 'review', 'author', 'text',
+                                 'pub_date')),
+}
+
+
+def render_ndjson(rows, fields):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def render_csv(rows, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        values = (row[field] for field in fields)
+        yield writer.writerow(
+            ','.join(value) if isinstance(value, list) else value
+            for value in values
+        )
+
+
+EXPORT_FORMATS = {
+    'ndjson': (render_ndjson, 'application/x-ndjson'),
+    'csv': (render_csv, 'text/csv'),
+}
@@ -1,28 +1,61 @@
+from django.db import connections
+from django.db.models import Count
+from django.db.models.expressions import RawSQL
 from django_filters import FilterSet, filters
+from rest_framework.filters import SearchFilter
 
 from reviews.models import Title
+from reviews.search import (TITLE_FTS_MATCH_SQL, TITLE_FTS_RANK_SQL,
+                            build_match_query, fts_supported, prefix_lookup)
+
+GENRE_MATCH_ANY = 'any'
+GENRE_MATCH_ALL = 'all'
+GENRE_MATCH_CHOICES = (
+    (GENRE_MATCH_ANY, 'Любой из жанров'),
+    (GENRE_MATCH_ALL, 'Все жанры'),
+)
+
+TitleGenre = Title.genre.through
+
+
+def split_slugs(value):
+    """Разбирает `drama,comedy` в список слагов без пустых значений."""
+    return [slug for slug in map(str.strip, value.split(',')) if slug]
+
+
+class NameSearchFilter(SearchFilter):
+    """Поиск `?search=` по началу нормализованного названия."""
+
+    def filter_queryset(self, request, queryset, view):
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        return queryset.filter(**prefix_lookup('name_search', ' '.join(terms)))
 
 
 class TitleFilter(FilterSet):
     search = filters.CharFilter(field_name='name',
-                                lookup_expr='icontains')
+                                method='filter_full_text')
+    q = filters.CharFilter(method='filter_full_text')
 
     class Meta:
         model = Title
         fields = ['search']
 
-    category = filters.CharFilter(
+    category = filters.CharFilter(method='filter_category')
+    category__icontains = filters.CharFilter(
         field_name='category__slug',
         lookup_expr='icontains'
-
     )
-    genre = filters.CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
+    genre = filters.CharFilter(method='filter_genre')
+    genre__icontains = filters.CharFilter(method='filter_genre_contains')
+    genre_match = filters.ChoiceFilter(
+        choices=GENRE_MATCH_CHOICES,
+        method='filter_genre_match'
     )
     name = filters.CharFilter(
-        field_name='name',
-        lookup_expr='icontains'
+        field_name='name_search',
+        method='filter_name_prefix'
     )
     year = filters.NumberFilter(
         field_name='year',
@@ -31,4 +64,58 @@ class TitleFilter(FilterSet):
 
     class Meta:
         model = Title
-        fields = ['name', 'year', 'category', 'genre']
+        fields = ['name', 'year', 'category', 'genre', 'q']
+
+    def filter_full_text(self, queryset, name, value):
+        """Поиск по FTS5-индексу с сортировкой по релевантности.
+
+        `q` ищет по названию и описанию, `search` - только по названию.
+        """
+        column = 'name' if name == 'name' else None
+        if not fts_supported(connections[queryset.db]):
+            return queryset.filter(name__icontains=value)
+        match = build_match_query(value, column)
+        if match is None:
+            return queryset.none()
+        return queryset.filter(
+            id__in=RawSQL(TITLE_FTS_MATCH_SQL, (match,))
+        ).annotate(
+            search_rank=RawSQL(TITLE_FTS_RANK_SQL, (match,))
+        ).order_by('search_rank', 'id')
+
+    def filter_name_prefix(self, queryset, name, value):
+        """Регистронезависимый поиск по началу названия по индексу."""
+        return queryset.filter(**prefix_lookup(name, value))
+
+    def filter_category(self, queryset, name, value):
+        """Точное совпадение слага категории, через запятую - любой.
+
+        Один слаг - равенством: SQLite берет произведения из индекса
+        category_id уже в порядке id, а с IN (...) сортирует их заново.
+        """
+        slugs = split_slugs(value)
+        if len(slugs) == 1:
+            return queryset.filter(category__slug=slugs[0])
+        return queryset.filter(category__slug__in=slugs)
+
+    def filter_genre(self, queryset, name, value):
+        """Отбор по слагам жанров полусоединением без DISTINCT.
+
+        `genre_match=any` (по умолчанию) - любой из жанров,
+        `genre_match=all` - все перечисленные жанры.
+        """
+        slugs = set(split_slugs(value))
+        links = TitleGenre.objects.filter(genre__slug__in=slugs)
+        if self.form.cleaned_data.get('genre_match') == GENRE_MATCH_ALL:
+            links = (links.order_by().values('title_id')
+                     .annotate(matched=Count('genre_id'))
+                     .filter(matched=len(slugs)))
+        return queryset.filter(id__in=links.values('title_id'))
+
+    def filter_genre_contains(self, queryset, name, value):
+        links = TitleGenre.objects.filter(genre__slug__icontains=value)
+        return queryset.filter(id__in=links.values('title_id'))
+
+    def filter_genre_match(self, queryset, name, value):
+        # Режим применяется в filter_genre.
+        return queryset
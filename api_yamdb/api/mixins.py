@@ -1,17 +1,196 @@
-from rest_framework import filters
+import time
+from functools import lru_cache
+from itertools import islice
+
+from django.http import StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from rest_framework import mixins, viewsets
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
 
-from api.paginators import StandardResultsSetPagination
+from api.cache import (get_cached_response, get_etag, get_last_modified,
+                       get_versions)
+from api.filters import NameSearchFilter
+from api.paginators import KeysetPagination, StandardResultsSetPagination
 from api.permissions import IsAdminOrReadOnly
+from api.serializers import get_sparse_fields
+from api_yamdb.routers import get_max_lag, pin_primary
+
+
+class ConditionalReadMixin:
+    """ETag и Last-Modified для GET-запросов к списку и объекту.
+
+    Оба значения строятся из версий моделей `version_models`, которые
+    сдвигаются сигналами при изменениях (см. `api.signals`), поэтому
+    ответ 304 отдается без запросов к БД и сериализации. Действие
+    `retrieve` подключается во вьюсете через `read_action`.
+    """
+
+    version_models = ()
+
+    def read_action(self, handler, request, *args, **kwargs):
+        if request.method != 'GET':
+            return handler(request, *args, **kwargs)
+        versions = get_versions(self.version_models)
+        etag = get_etag(request, versions)
+        last_modified = get_last_modified(self.version_models)
+        if last_modified is not None:
+            # Реплика могла еще не получить изменение, уже сдвинувшее
+            # версию: ETag и кэш не должны закрепить старый ответ.
+            if time.time() - last_modified < get_max_lag():
+                pin_primary()
+            last_modified = int(last_modified)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = self.serve_read(versions, handler, request,
+                                       *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def serve_read(self, versions, handler, request, *args, **kwargs):
+        return handler(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        return self.read_action(super().list, request, *args, **kwargs)
+
+
+class CachedReadMixin(ConditionalReadMixin):
+    """Дополнительно кэширует ответы на анонимные GET-запросы."""
+
+    def serve_read(self, versions, handler, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        return get_cached_response(request, versions, handler,
+                                   *args, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def get_field_names(serializer_class):
+    """Все поля сериализатора (без учета `?fields=`)."""
+    return list(serializer_class().fields)
+
+
+class SparseFieldsetViewMixin:
+    """Сокращает SQL под поля ответа из `?fields=` / `?exclude=`.
+
+    `sparse_columns` - поле ответа -> столбцы модели, которые
+    откладываются (defer), если поле не запрошено. Связи вьюсет
+    подключает сам, проверяя `includes_field()`.
+    """
+
+    sparse_columns = {}
+
+    def get_sparse_fields(self):
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = get_sparse_fields(
+                self.request, get_field_names(self.get_serializer_class())
+            )
+        return self._sparse_fields
+
+    def includes_field(self, name):
+        fields = self.get_sparse_fields()
+        return fields is None or name in fields
+
+    def defer_sparse_columns(self, queryset):
+        columns = [column for name, columns in self.sparse_columns.items()
+                   if not self.includes_field(name) for column in columns]
+        return queryset.defer(*columns) if columns else queryset
+
+
+class FastListMixin:
+    """Действие list без ModelSerializer.
+
+    Строки страницы читаются через `.values()` и собираются
+    `fast_representation` (см. `api.fast`) в ту же форму, что у
+    сериализатора, с учетом `?fields=` / `?exclude=`. Вьюсет должен
+    включать SparseFieldsetViewMixin.
+
+    С `?stream=1` страница JSON отдается потоком: конверт пагинатора,
+    затем элементы пачками по `stream_chunk_size` из курсора БД,
+    поэтому память не растет с размером страницы. Такие ответы
+    не кэшируются.
+    """
+
+    fast_representation = None
+    stream_query_param = 'stream'
+    stream_chunk_size = 200
+
+    def list(self, request, *args, **kwargs):
+        if self.fast_representation is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        representation = self.fast_representation()
+        field_names = self.get_sparse_fields()
+        if field_names is None:
+            field_names = get_field_names(self.get_serializer_class())
+        values = representation.get_values(field_names)
+        # Поля порядка нужны keyset-пагинации для курсора.
+        for attname, _ in KeysetPagination.get_ordering(queryset, self):
+            if attname not in values:
+                values.append(attname)
+        rows = queryset.prefetch_related(None).values(*values)
+        if self.can_stream():
+            page = self.paginator.paginate_queryset_lazy(rows, request, self)
+            if page is not None:
+                return self.stream_page(page, representation, field_names)
+        page = self.paginate_queryset(rows)
+        data = representation.build(
+            list(rows) if page is None else page, field_names
+        )
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+    def can_stream(self):
+        """Поток - по запросу, для компактного JSON и ленивого пагинатора."""
+        request = self.request
+        renderer = request.accepted_renderer
+        return (request.query_params.get(self.stream_query_param)
+                in ('1', 'true')
+                and isinstance(renderer, JSONRenderer) and renderer.compact
+                and renderer.get_indent(request.accepted_media_type,
+                                        {}) is None
+                and hasattr(self.paginator, 'paginate_queryset_lazy'))
+
+    def stream_page(self, page, representation, field_names):
+        renderer = self.request.accepted_renderer
+        # `results` - последний ключ конверта: поток вставляется вместо [].
+        head = renderer.render(self.get_paginated_response([]).data)
+        assert head.endswith(b'[]}'), 'results должен быть последним ключом'
+
+        def content():
+            yield head[:-2]
+            separator = b''
+            rows = page.iterator(chunk_size=self.stream_chunk_size)
+            while True:
+                chunk = list(islice(rows, self.stream_chunk_size))
+                if not chunk:
+                    break
+                items = renderer.render(
+                    representation.build(chunk, field_names)
+                )
+                yield separator + items[1:-1]
+                separator = b','
+            yield b']}'
+
+        return StreamingHttpResponse(content(),
+                                     content_type=renderer.media_type)
 
 
 class ListCreateDestroyMixin(
+    CachedReadMixin,
     mixins.ListModelMixin,
     mixins.CreateModelMixin,
     mixins.DestroyModelMixin,
     viewsets.GenericViewSet
 ):
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (NameSearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
     permission_classes = (IsAdminOrReadOnly,)
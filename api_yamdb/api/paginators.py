@@ -1,4 +1,16 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from operator import attrgetter, itemgetter
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (BasePagination, LimitOffsetPagination,
+                                       PageNumberPagination)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -7,3 +19,279 @@ class StandardResultsSetPagination(PageNumberPagination):
     page_size = 3
     page_size_query_param = 'page_size'
     max_page_size = 1000
+
+    def paginate_queryset_lazy(self, queryset, request, view=None):
+        """Как paginate_queryset, но страница - срез запроса без загрузки.
+
+        Ссылки и `count` ответа строятся по COUNT(*), строки
+        читаются при потоковой отдаче (см. FastListMixin).
+        """
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            ))
+        self.request = request
+        return self.page.object_list
+
+
+class KeysetPagination(BasePagination):
+    """Пагинация по ключу (keyset) с непрозрачным курсором.
+
+    Включается параметром `?cursor=` (пустое значение - первая страница),
+    без него запрос обслуживает `fallback_class`. Порядок берется из
+    `view.keyset_ordering`, запроса или `Meta.ordering` модели и
+    дополняется `id`, поэтому поля порядка (и аннотации) должны быть
+    NOT NULL. Следующая страница выбирается условием по позиции
+    последней записи, без OFFSET и COUNT(*).
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    fallback_class = None
+    invalid_cursor_message = 'Некорректный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.fallback = None
+        if self.cursor_query_param not in request.query_params:
+            if self.fallback_class is None:
+                return None
+            self.fallback = self.fallback_class()
+            return self.fallback.paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+        self.ordering = self.get_ordering(queryset, view)
+        if position is not None:
+            position = self.clean_position(position, queryset)
+
+        queryset = queryset.order_by(*(
+            ('-' if descending != reverse else '') + attname
+            for attname, descending in self.ordering
+        ))
+        if position is not None:
+            queryset = queryset.filter(
+                self.get_position_filter(position, reverse)
+            )
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = results
+        return results
+
+    def paginate_queryset_lazy(self, queryset, request, view=None):
+        """Как paginate_queryset, но страница - запрос без загрузки строк.
+
+        Для ссылок читаются только поля порядка первой строки и строк
+        на границе страницы. Страница назад выбирается по возрастанию
+        между найденной границей и курсором.
+        """
+        self.fallback = None
+        if self.cursor_query_param not in request.query_params:
+            if self.fallback_class is None:
+                return None
+            self.fallback = self.fallback_class()
+            lazy = getattr(self.fallback, 'paginate_queryset_lazy', None)
+            return lazy and lazy(queryset, request, view)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+        self.ordering = self.get_ordering(queryset, view)
+        if position is not None:
+            position = self.clean_position(position, queryset)
+
+        attnames = [attname for attname, _ in self.ordering]
+        ordered = queryset.order_by(*(
+            ('-' if descending != reverse else '') + attname
+            for attname, descending in self.ordering
+        ))
+        if position is not None:
+            ordered = ordered.filter(
+                self.get_position_filter(position, reverse)
+            )
+        first = ordered.values(*attnames).first()
+        edge = list(ordered.values(*attnames)[
+            self.page_size - 1:self.page_size + 1
+        ])
+        has_more = len(edge) > 1
+        if first is None:
+            self.page = []
+        elif reverse:
+            self.page = [edge[0] if edge else first, first]
+        else:
+            self.page = [first, edge[0] if edge else first]
+        if reverse:
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        if not reverse:
+            return ordered[:self.page_size]
+
+        ascending = queryset.order_by(*(
+            ('-' if descending else '') + attname
+            for attname, descending in self.ordering
+        )).filter(self.get_position_filter(position, True))
+        if edge:
+            boundary = [edge[0][attname] for attname in attnames]
+            ascending = ascending.filter(
+                ~self.get_position_filter(boundary, True)
+            )
+        return ascending[:self.page_size]
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_page_size(self, request):
+        default = getattr(self.fallback_class, 'page_size', None)
+        page_size = default or api_settings.PAGE_SIZE
+        try:
+            value = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return page_size
+        if value > 0:
+            return min(value, self.max_page_size)
+        return page_size
+
+    @staticmethod
+    def get_ordering(queryset, view):
+        """Пары (attname, по убыванию) порядка страницы, с `id` в конце."""
+        ordering = (getattr(view, 'keyset_ordering', None)
+                    or queryset.query.order_by
+                    or queryset.model._meta.ordering)
+        opts = queryset.model._meta
+        result = []
+        for name in ordering:
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            try:
+                field = opts.pk if name == 'pk' else opts.get_field(name)
+            except FieldDoesNotExist:
+                # Аннотация запроса, например ранг полнотекстового поиска.
+                result.append((name, descending))
+                continue
+            result.append((field.attname, descending))
+        if opts.pk.attname not in (attname for attname, _ in result):
+            result.append((opts.pk.attname, False))
+        return result
+
+    def clean_position(self, position, queryset):
+        """Приводит значения курсора к типам полей порядка.
+
+        Значения аннотаций (например, ранг поиска) должны быть числами.
+        Некорректный курсор - ответ 404, как и неразборчивый.
+        """
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        opts = queryset.model._meta
+        cleaned = []
+        for (attname, _), value in zip(self.ordering, position):
+            if value is None or isinstance(value, (bool, dict, list)):
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                field = opts.get_field(attname)
+            except FieldDoesNotExist:
+                if not isinstance(value, (int, float)):
+                    raise NotFound(self.invalid_cursor_message)
+                cleaned.append(value)
+                continue
+            try:
+                value = field.to_python(value)
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+            if value is None:
+                raise NotFound(self.invalid_cursor_message)
+            cleaned.append(value)
+        return cleaned
+
+    def get_position_filter(self, position, reverse):
+        conditions = Q()
+        equal = {}
+        for (attname, descending), value in zip(self.ordering, position):
+            lookup = 'lt' if descending != reverse else 'gt'
+            conditions |= Q(**equal, **{f'{attname}__{lookup}': value})
+            equal[attname] = value
+        attname, descending = self.ordering[0]
+        lookup = 'lte' if descending != reverse else 'gte'
+        return Q(**{f'{attname}__{lookup}': position[0]}) & conditions
+
+    def get_position(self, instance):
+        # Страница - модели или строки `.values()` (см. FastListMixin).
+        getter = itemgetter if isinstance(instance, dict) else attrgetter
+        values = getter(*(attname for attname, _ in self.ordering))(
+            instance
+        )
+        if len(self.ordering) == 1:
+            values = (values,)
+        return [
+            value.isoformat() if hasattr(value, 'isoformat') else value
+            for value in values
+        ]
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': int(reverse)},
+                             separators=(',', ':'))
+        cursor = base64.urlsafe_b64encode(payload.encode()).decode()
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.cursor_query_param, cursor)
+        return replace_query_param(url, self.page_size_query_param,
+                                   self.page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+            position, reverse = payload['p'], bool(payload['r'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), True)
+
+    def get_schema_operation_parameters(self, view):
+        if self.fallback_class is None:
+            return []
+        return self.fallback_class().get_schema_operation_parameters(view)
+
+
+class StandardKeysetPagination(KeysetPagination):
+    """Номера страниц по умолчанию, keyset-пагинация по `?cursor=`."""
+
+    fallback_class = StandardResultsSetPagination
+
+
+class LimitOffsetKeysetPagination(KeysetPagination):
+    """limit/offset по умолчанию, keyset-пагинация по `?cursor=`."""
+
+    fallback_class = LimitOffsetPagination
@@ -0,0 +1,69 @@
+from django.conf import settings
+from rest_framework.compat import SHORT_SEPARATORS
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    ORJSON_OPTIONS = 0
+else:
+    # Даты и dataclass - через encoder_class.default, как в JSONRenderer.
+    ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS
+                      | orjson.OPT_PASSTHROUGH_DATETIME
+                      | orjson.OPT_PASSTHROUGH_DATACLASS)
+
+# U+2028 и U+2029 в UTF-8 начинаются с этих байтов.
+LINE_SEPARATOR_PREFIX = b'\xe2\x80'
+
+
+def use_orjson():
+    """orjson включен настройкой API_JSON_BACKEND и установлен."""
+    return (orjson is not None
+            and getattr(settings, 'API_JSON_BACKEND', 'orjson') == 'orjson')
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson с тем же ответом, что у JSONRenderer.
+
+    Даты, Decimal, ленивые строки и прочие типы не из JSON кодируются
+    `encoder_class.default`, как в JSONRenderer; U+2028 и U+2029
+    экранируются так же. Если orjson не установлен, выключен или
+    не справился с данными, ответ собирает кодировщик stdlib, созданный
+    один раз в конструкторе. Форматированный (indent), ASCII- и
+    не компактный вывод отдается родительскому классу.
+
+    Отличия orjson касаются только чисел вне диапазона ответов API:
+    float меньше 1e-4 или от 1e16 записываются иначе (0.00001 вместо
+    1e-05, 1e16 вместо 1e+16, значение то же), а NaN и бесконечность -
+    как null вместо ошибки.
+    """
+
+    def __init__(self):
+        self.encoder = self.encoder_class(
+            ensure_ascii=False, allow_nan=not self.strict,
+            separators=SHORT_SEPARATORS
+        )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (data is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type,
+                                   renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        if use_orjson():
+            try:
+                content = orjson.dumps(data, default=self.encoder.default,
+                                       option=ORJSON_OPTIONS)
+            except orjson.JSONEncodeError:
+                pass
+            else:
+                if LINE_SEPARATOR_PREFIX in content:
+                    content = (content
+                               .replace(b'\xe2\x80\xa8', b'\\u2028')
+                               .replace(b'\xe2\x80\xa9', b'\\u2029'))
+                return content
+        content = self.encoder.encode(data)
+        return content.replace('\u2028', '\\u2028').replace(
+            '\u2029', '\\u2029'
+        ).encode()
@@ -1,15 +1,65 @@
 from django.contrib.auth import get_user_model
-from django.shortcuts import get_object_or_404
+from django.db import IntegrityError, transaction
+from django.db.models import Q
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
 
 from api.constants import REGEX_SIGNS, REGEX_ME
+from api.filters import split_slugs
 from reviews.models import Category, Comment, Genre, Review, Title
 
 User = get_user_model()
 
-
-class UserSerializer(serializers.ModelSerializer):
+FIELDS_PARAM = 'fields'
+EXCLUDE_PARAM = 'exclude'
+
+
+def get_sparse_fields(request, field_names):
+    """Поля ответа по `?fields=` и `?exclude=` или None, если не заданы.
+
+    Учитываются только GET-запросы; неизвестные поля - ошибка 400.
+    """
+    if request is None or request.method != 'GET':
+        return None
+    params = request.query_params
+    if FIELDS_PARAM not in params and EXCLUDE_PARAM not in params:
+        return None
+    requested = {
+        param: split_slugs(params[param])
+        for param in (FIELDS_PARAM, EXCLUDE_PARAM) if param in params
+    }
+    for param, names in requested.items():
+        unknown = [name for name in names if name not in field_names]
+        if unknown:
+            raise ValidationError(
+                {param: f'Неизвестные поля: {", ".join(unknown)}.'}
+            )
+    fields = requested.get(FIELDS_PARAM, field_names)
+    exclude = requested.get(EXCLUDE_PARAM, ())
+    return [name for name in field_names
+            if name in fields and name not in exclude]
+
+
+class SparseFieldsetMixin:
+    """Оставляет в ответе только поля из `?fields=` / `?exclude=`.
+
+    Действует на сериализатор верхнего уровня (и элементы списка),
+    вложенные сериализаторы отдают свои поля целиком.
+    """
+
+    def get_field_names(self, declared_fields, info):
+        field_names = super().get_field_names(declared_fields, info)
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            return field_names
+        fields = get_sparse_fields(self.context.get('request'),
+                                   field_names)
+        return field_names if fields is None else fields
+
+
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     role = serializers.ChoiceField(choices=['user', 'moderator', 'admin'],
                                    required=False)
 
@@ -48,21 +98,51 @@ class SignupSerializer(serializers.ModelSerializer):
         return value
 
     def validate(self, data):
-        username = data.get('username')
-        email = data.get('email')
+        self.instance = self.get_signup_user(data['username'], data['email'])
+        return data
+
+    @staticmethod
+    def get_signup_user(username, email):
+        """Пользователь с этой парой имени и почты или None.
 
-        user_with_same_username = (User.objects
-                                   .filter(username=username).first())
-        user_with_same_email = (User.objects
-                                .filter(email=email).first())
+        Оба конфликта определяются одним запросом `username OR email`.
+        """
+        users = (User.objects
+                 .filter(Q(username=username) | Q(email=email))
+                 .only('id', 'username', 'email').order_by()[:2])
+        signup_user = None
         messege_error = {}
-        if user_with_same_username and user_with_same_username.email != email:
-            messege_error['username'] = username
-        if user_with_same_email and user_with_same_email.username != username:
-            messege_error['email'] = email
+        for user in users:
+            if user.username == username and user.email == email:
+                signup_user = user
+            elif user.username == username:
+                messege_error['username'] = username
+            else:
+                messege_error['email'] = email
         if len(messege_error) > 0:
             raise serializers.ValidationError(messege_error)
-        return data
+        return signup_user
+
+    def create(self, validated_data):
+        user = User(**validated_data)
+        user.generate_confirmation_code()
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
+        except IntegrityError:
+            # Параллельная регистрация успела занять имя или почту.
+            existing = self.get_signup_user(**validated_data)
+            if existing is None:
+                raise
+            return self.update(existing, validated_data)
+        return user
+
+    def update(self, instance, validated_data):
+        instance.generate_confirmation_code()
+        User.objects.filter(pk=instance.pk).update(
+            confirmation_code=instance.confirmation_code
+        )
+        return instance
 
 
 class TokenSerializer(serializers.Serializer):
@@ -71,26 +151,26 @@ class TokenSerializer(serializers.Serializer):
     confirmation_code = serializers.CharField(required=True)
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Category
-        exclude = ('id',)
+        exclude = ('id', 'name_search')
         lookup_field = 'slug'
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Genre
-        exclude = ('id',)
+        exclude = ('id', 'name_search')
         lookup_field = 'slug'
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(many=True, read_only=True)
-    rating = serializers.FloatField(read_only=True)  # Изменение тут
+    rating = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Title
@@ -112,10 +192,10 @@ class TitleCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Title
-        fields = '__all__'
+        exclude = ('rating_sum', 'rating_count', 'name_search')
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(read_only=True,
                                           slug_field='username')
 
@@ -123,26 +203,31 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         fields = ('id', 'text', 'author', 'score', 'pub_date')
 
-    def create(self, validated_data):
-        request = self.context.get('request')
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        validated_data['author'] = request.user
-        validated_data['title'] = title
-        return super().create(validated_data)
-
     def validate(self, data):
         request = self.context.get('request')
         if request and request.method == 'POST':
-            title_id = self.context['view'].kwargs.get('title_id')
-            title = get_object_or_404(Title, pk=title_id)
+            title = self.context['view'].get_title()
             if Review.objects.filter(title=title,
                                      author=request.user).exists():
                 raise ValidationError('Review already exists')
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class ReviewBatchSerializer(ReviewSerializer):
+    """Отзыв из пакета: произведение задается в теле запроса."""
+
+    title = serializers.IntegerField(source='title_id')
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('title',)
+
+    def validate(self, data):
+        # Существование произведения и повторы проверяются для всего
+        # пакета сразу, см. api.batch.
+        return data
+
+
+class CommentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     author = serializers.SlugRelatedField(read_only=True,
                                           slug_field='username')
 
@@ -150,3 +235,13 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'pub_date')
         model = Comment
         read_only_fields = ('review',)
+
+
+class CommentBatchSerializer(CommentSerializer):
+    """Комментарий из пакета: отзыв задается в теле запроса."""
+
+    review = serializers.IntegerField(source='review_id')
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ('review',)
+        read_only_fields = ()
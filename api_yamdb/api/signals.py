@@ -0,0 +1,40 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.authentication import invalidate_user
+from api.cache import bump_version
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_model_version(sender, **kwargs):
+    """Сдвигает версию модели после фиксации транзакции."""
+    transaction.on_commit(lambda: bump_version(sender))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def bump_title_genre_version(sender, action, **kwargs):
+    if action.startswith('post_'):
+        transaction.on_commit(lambda: bump_version(Title))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, created=False, **kwargs):
+    # У нового пользователя нет токенов и записи в кэше. Отметка - после
+    # фиксации: она новее любого чтения, видевшего старое состояние.
+    if created:
+        return
+    transaction.on_commit(lambda: invalidate_user(instance.pk))
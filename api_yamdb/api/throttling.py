@@ -0,0 +1,161 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle, SimpleRateThrottle
+
+BUCKET_KEY = 'throttle:{scope}:{ident}'
+
+
+def take_token(state, now, capacity, rate):
+    """Шаг token bucket: новое состояние и время ожидания (0 - пропустить).
+
+    `state` - пара (токены, время обновления) или None для новой корзины.
+    """
+    tokens, updated = state or (capacity, now)
+    tokens = min(capacity, tokens + (now - updated) * rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / rate
+
+
+class LocalBucketStore:
+    """Корзины в памяти процесса: быстро, но у каждого воркера свои."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, now, capacity, rate):
+        with self._lock:
+            state, wait = take_token(self._buckets.pop(key, None), now,
+                                     capacity, rate)
+            self._buckets[key] = state
+            if len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteBucketStore:
+    """Корзины в отдельном файле SQLite, общем для всех воркеров хоста.
+
+    Чтение и запись корзины идут в одной транзакции `BEGIN IMMEDIATE`,
+    поэтому параллельные процессы не тратят один токен дважды.
+    Основная БД проекта не затрагивается.
+    """
+
+    CREATE_SQL = ('CREATE TABLE IF NOT EXISTS bucket ('
+                  'key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+                  'updated REAL NOT NULL)')
+    SELECT_SQL = 'SELECT tokens, updated FROM bucket WHERE key = ?'
+    UPSERT_SQL = ('INSERT OR REPLACE INTO bucket (key, tokens, updated) '
+                  'VALUES (?, ?, ?)')
+    PURGE_SQL = 'DELETE FROM bucket WHERE updated < ?'
+    # Как часто (в вызовах) удалять давно не менявшиеся корзины.
+    PURGE_EVERY = 1000
+
+    def __init__(self, path, timeout=5, max_idle=3600):
+        self.path = str(path)
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._local = threading.local()
+
+    def get_connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=self.timeout,
+                                         isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(self.CREATE_SQL)
+            self._local.connection = connection
+            self._local.calls = 0
+        return connection
+
+    def consume(self, key, now, capacity, rate):
+        connection = self.get_connection()
+        self._local.calls += 1
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            state, wait = take_token(
+                connection.execute(self.SELECT_SQL, (key,)).fetchone(),
+                now, capacity, rate
+            )
+            connection.execute(self.UPSERT_SQL, (key, *state))
+            if self._local.calls % self.PURGE_EVERY == 0:
+                connection.execute(self.PURGE_SQL, (now - self.max_idle,))
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+        return wait
+
+    def clear(self):
+        self.get_connection().execute('DELETE FROM bucket')
+
+
+@lru_cache(maxsize=None)
+def get_bucket_store():
+    config = settings.AUTH_THROTTLE_STORE
+    return import_string(config['BACKEND'])(**config.get('OPTIONS', {}))
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Token bucket: `rate` вида '10/min' - емкость и скорость пополнения.
+
+    Корзины хранятся в `get_bucket_store()` по ключу `get_ident()`
+    (по умолчанию IP). Проверка выполняется до обработчика и
+    не обращается к основной БД.
+    """
+
+    scope = None
+
+    def __init__(self):
+        self.wait_time = 0
+
+    def allow_request(self, request, view):
+        ident = self.get_ident(request)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if ident is None or rate is None:
+            return True
+        capacity, period = SimpleRateThrottle.parse_rate(None, rate)
+        self.wait_time = get_bucket_store().consume(
+            BUCKET_KEY.format(scope=self.scope, ident=ident),
+            time.time(), capacity, capacity / period
+        )
+        return self.wait_time == 0
+
+    def wait(self):
+        return self.wait_time
+
+
+class AuthIPThrottle(TokenBucketThrottle):
+    """Ограничение запросов к auth-эндпоинтам с одного IP."""
+
+    scope = 'auth_ip'
+
+
+class AuthUsernameThrottle(TokenBucketThrottle):
+    """Ограничение попыток для одного имени пользователя с любых IP."""
+
+    scope = 'auth_username'
+
+    def get_ident(self, request):
+        # Тело не объект (список, строка): ошибку вернет сериализатор.
+        if not isinstance(request.data, Mapping):
+            return None
+        username = request.data.get('username')
+        if not isinstance(username, str) or not username:
+            return None
+        return username[:150].lower()
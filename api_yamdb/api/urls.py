@@ -1,9 +1,9 @@
 from django.urls import include, path
 from rest_framework.routers import SimpleRouter
 
-from .views import (CategoryViewSet, CommentsViewSet, GenreViewSet,
-                    ReviewViewSet, SignupView, TitleViewSet, TokenView,
-                    UsersViewSet, UserInfoViewSet)
+from .views import (BatchViewSet, CategoryViewSet, CommentsViewSet,
+                    ExportViewSet, GenreViewSet, ReviewViewSet, SignupView,
+                    TitleViewSet, TokenView, UsersViewSet, UserInfoViewSet)
 
 router = SimpleRouter()
 
@@ -19,6 +19,8 @@ router.register('categories', CategoryViewSet, basename='categories')
 router.register('genres', GenreViewSet, basename='genres')
 router.register('titles', TitleViewSet, basename='title')
 router.register(r'auth', TokenView, basename='auth')
+router.register('export', ExportViewSet, basename='export')
+router.register('batch', BatchViewSet, basename='batch')
 
 app_name = 'api'
 
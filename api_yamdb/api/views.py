@@ -1,19 +1,28 @@
-from django.conf import settings
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, views, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework.status import HTTP_200_OK, HTTP_400_BAD_REQUEST
+from rest_framework.status import (HTTP_200_OK, HTTP_201_CREATED,
+                                   HTTP_207_MULTI_STATUS,
+                                   HTTP_400_BAD_REQUEST)
 from rest_framework.viewsets import ModelViewSet
 
-from api.filters import TitleFilter
-from api.mixins import ListCreateDestroyMixin
-from api.paginators import StandardResultsSetPagination
+from api.authentication import get_access_token
+from api.batch import create_comments, create_reviews
+from api.exports import EXPORT_FORMATS, EXPORTS
+from api.fast import (CommentRepresentation, ReviewRepresentation,
+                      TitleRepresentation)
+from api.filters import TitleFilter, split_slugs
+from api.mixins import (CachedReadMixin, ConditionalReadMixin,
+                        FastListMixin, ListCreateDestroyMixin,
+                        SparseFieldsetViewMixin)
+from api.paginators import (LimitOffsetKeysetPagination,
+                            StandardKeysetPagination)
 from api.permissions import (IsAdmin, IsAdminOrReadOnly,
                              IsAuthorOrModeratorOrReadOnly)
 from api.serializers import (CategorySerializer, CommentSerializer,
@@ -21,33 +30,30 @@ from api.serializers import (CategorySerializer, CommentSerializer,
                              SignupSerializer, TitleCreateSerializer,
                              TitleSerializer, TokenSerializer,
                              UserSerializer)
+from api.throttling import AuthIPThrottle, AuthUsernameThrottle
 from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.outbox import enqueue_mail
 
 
 class SignupView(views.APIView):
     """Модель подключения пользователей."""
 
     permission_classes = [AllowAny]
+    # Токен в заголовке здесь не нужен: аутентификация не ходит в БД.
+    authentication_classes = []
+    throttle_classes = [AuthIPThrottle, AuthUsernameThrottle]
 
     def post(self, request):
         serializer = SignupSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        username = serializer.validated_data['username']
-        email = serializer.validated_data['email']
-
-        user, created = User.objects.get_or_create(
-            username=username,
-            email=email
-        )
-        confirmation_code = user.generate_confirmation_code()
-        send_mail(
-            'Confirmation code',
-            f'Your confirmation code is {confirmation_code}',
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
+        with transaction.atomic():
+            user = serializer.save()
+            enqueue_mail(
+                'Confirmation code',
+                f'Your confirmation code is {user.confirmation_code}',
+                [user.email],
+            )
         return Response(serializer.data, status=HTTP_200_OK)
 
 
@@ -55,6 +61,9 @@ class TokenView(viewsets.ViewSet):
     """Модель проверки токена пользователей."""
 
     permission_classes = [AllowAny]
+    # Токен в заголовке здесь не нужен: аутентификация не ходит в БД.
+    authentication_classes = []
+    throttle_classes = [AuthIPThrottle, AuthUsernameThrottle]
 
     @action(methods=['POST'], detail=False, url_path='token')
     def post(self, request):
@@ -67,7 +76,7 @@ class TokenView(viewsets.ViewSet):
         user_confirmation_code = str(user.confirmation_code or 0)
 
         if user_confirmation_code == confirmation_code:
-            token = RefreshToken.for_user(user).access_token
+            token = get_access_token(user)
             return Response({'token': str(token)}, status=HTTP_200_OK)
         return Response(
             {'confirmation_code': 'Ошибка, неверный confirmation code'},
@@ -90,10 +99,12 @@ class UserInfoViewSet(ModelViewSet):
             permission_classes=[IsAuthenticated],
             url_path='me')
     def get_current_user_info(self, request):
+        # request.user собран из токена, профилю нужны все поля.
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'GET':
-            serializer = UserSerializer(request.user)
+            serializer = UserSerializer(user)
             return Response(serializer.data, status=HTTP_200_OK)
-        serializer = UserSerializer(request.user, data=request.data,
+        serializer = UserSerializer(user, data=request.data,
                                     partial=True)
         serializer.is_valid(raise_exception=True)
         if not ('role' in request.data):
@@ -101,7 +112,7 @@ class UserInfoViewSet(ModelViewSet):
         return Response(serializer.data)
 
 
-class UsersViewSet(ModelViewSet):
+class UsersViewSet(SparseFieldsetViewMixin, ModelViewSet):
     """По модели пользователей запросы 'get', 'post', 'patch', 'delete'."""
 
     queryset = User.objects.all()
@@ -109,8 +120,14 @@ class UsersViewSet(ModelViewSet):
     permission_classes = [IsAdmin]
     lookup_field = 'username'
     http_method_names = ['get', 'post', 'patch', 'delete']
+    pagination_class = LimitOffsetKeysetPagination
     filter_backends = (filters.SearchFilter,)
     search_fields = ('username',)
+    sparse_columns = {'email': ('email',), 'first_name': ('first_name',),
+                      'last_name': ('last_name',), 'bio': ('bio',)}
+
+    def get_queryset(self):
+        return self.defer_sparse_columns(super().get_queryset())
 
 
 class CategoryViewSet(ListCreateDestroyMixin):
@@ -118,6 +135,7 @@ class CategoryViewSet(ListCreateDestroyMixin):
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    version_models = (Category,)
 
 
 class GenreViewSet(ListCreateDestroyMixin):
@@ -125,53 +143,231 @@ class GenreViewSet(ListCreateDestroyMixin):
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    version_models = (Genre,)
 
 
-class TitleViewSet(ModelViewSet):
+class TitleViewSet(SparseFieldsetViewMixin, CachedReadMixin, FastListMixin,
+                   ModelViewSet):
     """Модель по произведениям. Доступна всем, изменения - администратору."""
 
-    queryset = Title.objects.order_by('id').annotate(
-        rating=Avg('reviews__score')
-    )
+    queryset = Title.objects.order_by('id')
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = StandardResultsSetPagination
+    pagination_class = StandardKeysetPagination
     http_method_names = ['get', 'post', 'patch', 'delete']
+    version_models = (Title, Genre, Category, Review)
+    ids_query_param = 'ids'
+    max_ids = 100
+    fast_representation = TitleRepresentation
+    sparse_columns = {'description': ('description',),
+                      'rating': ('rating_sum', 'rating_count')}
+
+    def get_queryset(self):
+        queryset = self.defer_sparse_columns(super().get_queryset())
+        if self.includes_field('category'):
+            queryset = queryset.select_related('category')
+        if self.includes_field('genre'):
+            queryset = queryset.prefetch_related('genre')
+        return queryset
 
     def get_serializer_class(self):
         if self.action in ('create', 'update', 'partial_update'):
             return TitleCreateSerializer
         return TitleSerializer
 
-
-class ReviewViewSet(ModelViewSet):
+    def retrieve(self, request, *args, **kwargs):
+        return self.read_action(super().retrieve, request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        if self.ids_query_param in request.query_params:
+            return self.read_action(self.list_by_ids, request,
+                                    *args, **kwargs)
+        return super().list(request, *args, **kwargs)
+
+    def list_by_ids(self, request, *args, **kwargs):
+        """Произведения `?ids=1,5,9` в порядке запроса и ненайденные id.
+
+        Два запроса при любом числе id: произведения с категориями
+        и жанры для них.
+        """
+        ids = self.get_requested_ids()
+        titles = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer(
+            [titles[pk] for pk in ids if pk in titles], many=True
+        )
+        return Response({
+            'results': serializer.data,
+            'missing': [pk for pk in ids if pk not in titles],
+        })
+
+    def get_requested_ids(self):
+        raw = self.request.query_params[self.ids_query_param]
+        try:
+            ids = list(dict.fromkeys(int(pk) for pk in split_slugs(raw)))
+        except ValueError:
+            raise ValidationError(
+                {self.ids_query_param: 'Ожидается список целых чисел '
+                                       'через запятую.'}
+            )
+        if not 0 < len(ids) <= self.max_ids:
+            raise ValidationError(
+                {self.ids_query_param: f'Укажите от 1 до {self.max_ids} '
+                                       f'id.'}
+            )
+        return ids
+
+
+class ReviewViewSet(SparseFieldsetViewMixin, ConditionalReadMixin,
+                    FastListMixin, ModelViewSet):
     """Модель отзывов по произведениям. Стандартные запросы кроме PUT."""
 
     permission_classes = (IsAuthorOrModeratorOrReadOnly,)
     serializer_class = ReviewSerializer
     queryset = Review.objects.all()
     http_method_names = ['get', 'post', 'patch', 'delete']
-    pagination_class = StandardResultsSetPagination
+    pagination_class = StandardKeysetPagination
+    version_models = (Review, Title, User)
+    fast_representation = ReviewRepresentation
+    sparse_columns = {'text': ('text',)}
+
+    def get_title(self):
+        """Произведение из URL, загружается один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(Title,
+                                            pk=self.kwargs.get('title_id'))
+        return self._title
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        if self.action == 'list':
+            queryset = self.get_title().reviews.all()
+        else:
+            # Объект ищется вместе с проверкой произведения одним запросом.
+            queryset = Review.objects.filter(
+                title_id=self.kwargs.get('title_id')
+            ).select_related('title')
+        if self.includes_field('author'):
+            queryset = queryset.select_related('author')
+        return self.defer_sparse_columns(queryset)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.read_action(super().retrieve, request, *args, **kwargs)
+
+    # Рейтинг произведения сдвигают сигналы отзыва (reviews.signals),
+    # atomic - чтобы отзыв и рейтинг менялись в одной транзакции.
+    @transaction.atomic
+    def perform_create(self, serializer):
+        serializer.save(author=self.request.user, title=self.get_title())
 
+    @transaction.atomic
+    def perform_update(self, serializer):
+        serializer.save()
 
-class CommentsViewSet(ModelViewSet):
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+
+
+class CommentsViewSet(SparseFieldsetViewMixin, ConditionalReadMixin,
+                      FastListMixin, ModelViewSet):
     """Модель комментариев по отзывам. Стандартные запросы кроме PUT."""
 
     permission_classes = (IsAuthorOrModeratorOrReadOnly,)
     serializer_class = CommentSerializer
     queryset = Comment.objects.all()
     http_method_names = ['get', 'post', 'patch', 'delete']
-    pagination_class = StandardResultsSetPagination
+    pagination_class = StandardKeysetPagination
+    version_models = (Comment, Review, Title, User)
+    fast_representation = CommentRepresentation
+    sparse_columns = {'text': ('text',)}
+
+    def get_review(self):
+        """Отзыв из URL с проверкой произведения, один запрос за запрос."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                pk=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id')
+            )
+        return self._review
+
+    def get_queryset(self):
+        if self.action == 'list':
+            queryset = self.get_review().comments.all()
+        else:
+            queryset = Comment.objects.filter(
+                review_id=self.kwargs.get('review_id'),
+                review__title_id=self.kwargs.get('title_id')
+            )
+        if self.includes_field('author'):
+            queryset = queryset.select_related('author')
+        return self.defer_sparse_columns(queryset)
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.read_action(super().retrieve, request, *args, **kwargs)
+
+
+class ExportViewSet(viewsets.ViewSet):
+    """Потоковая выгрузка таблиц для администраторов (NDJSON или CSV)."""
+
+    permission_classes = (IsAdmin,)
+    output_param = 'output'
+
+    def export(self, request, name):
+        output = request.query_params.get(self.output_param, 'ndjson')
+        if output not in EXPORT_FORMATS:
+            raise ValidationError(
+                {self.output_param: f'Доступные форматы: '
+                                    f'{", ".join(EXPORT_FORMATS)}.'}
+            )
+        rows, fields = EXPORTS[name]
+        render, content_type = EXPORT_FORMATS[output]
+        response = StreamingHttpResponse(
+            render(rows(), fields),
+            content_type=f'{content_type}; charset=utf-8'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{name}.{output}"'
+        )
+        return response
 
-    def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs.get('review_id'))
-        return review.comments.all()
+    @action(methods=['get'], detail=False)
+    def titles(self, request):
+        return self.export(request, 'titles')
+
+    @action(methods=['get'], detail=False)
+    def reviews(self, request):
+        return self.export(request, 'reviews')
+
+    @action(methods=['get'], detail=False)
+    def comments(self, request):
+        return self.export(request, 'comments')
+
+
+class BatchViewSet(viewsets.ViewSet):
+    """Пакетное создание отзывов и комментариев от имени пользователя.
+
+    Ответ содержит результат для каждого элемента в порядке запроса:
+    201 - все элементы созданы, 207 - часть элементов отклонена.
+    """
+
+    permission_classes = (IsAuthenticated,)
+
+    def create_batch(self, request, create):
+        results = create(request.user, request.data)
+        status = (HTTP_201_CREATED
+                  if all(result['status'] == HTTP_201_CREATED
+                         for result in results)
+                  else HTTP_207_MULTI_STATUS)
+        return Response(results, status=status)
+
+    @action(methods=['post'], detail=False)
+    def reviews(self, request):
+        return self.create_batch(request, create_reviews)
+
+    @action(methods=['post'], detail=False)
+    def comments(self, request):
+        return self.create_batch(request, create_comments)
@@ -1,7 +1,31 @@
 from django.db import models
 
+from reviews.search import normalize_search_text
 
-class BaseModelCategoryGenre(models.Model):
+
+class NormalizedNameModel(models.Model):
+    """Абстрактная модель с нормализованной копией названия для поиска."""
+
+    name_search = models.CharField(
+        max_length=256,
+        default='',
+        editable=False,
+        db_index=True,
+        verbose_name='Название для поиска'
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        self.name_search = normalize_search_text(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'name_search'}
+        super().save(*args, **kwargs)
+
+
+class BaseModelCategoryGenre(NormalizedNameModel):
     """Базовая модель жанров и категорий произведений."""
 
     name = models.CharField(
@@ -15,7 +39,7 @@ class BaseModelCategoryGenre(models.Model):
         verbose_name='Слаг'
     )
 
-    class Meta:
+    class Meta(NormalizedNameModel.Meta):
         abstract = True
 
     def __str__(self):
@@ -0,0 +1,165 @@
+import random
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils.functional import LazyObject, empty
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_KEY = 'db:primary:{user_id}'
+
+current_state = ContextVar('replica_routing_state', default=None)
+
+
+def get_replica_settings():
+    return {'ALIASES': [], 'MAX_LAG': 5, 'CACHE': 'default',
+            **getattr(settings, 'DATABASE_REPLICAS', {})}
+
+
+def pin_primary():
+    """Дальнейшее чтение текущего запроса - с основной БД."""
+    state = current_state.get()
+    if state is not None:
+        state.pinned = True
+
+
+def get_max_lag():
+    """Сколько секунд реплики могут отставать или 0 без реплик."""
+    config = get_replica_settings()
+    return config['MAX_LAG'] if config['ALIASES'] else 0
+
+
+def get_known_user(request):
+    """Пользователь запроса, если он уже определен, иначе None.
+
+    Ленивый пользователь AuthenticationMiddleware не вычисляется:
+    его загрузка сама идет через роутер. DRF подставляет
+    пользователя в request после аутентификации.
+    """
+    user = getattr(request, 'user', None)
+    if isinstance(user, LazyObject) and user._wrapped is empty:
+        return None
+    if user is None or not user.is_authenticated:
+        return None
+    return user
+
+
+class RoutingState:
+    """Выбор БД для чтения в рамках одного запроса."""
+
+    def __init__(self, request, config):
+        self.request = request
+        self.config = config
+        self.wrote = False
+        self.pinned = False
+        self.sticky = None
+        self._replica = None
+
+    @property
+    def replica(self):
+        # Одна реплика на запрос: count и страница читаются из одной БД.
+        if self._replica is None:
+            self._replica = random.choice(self.config['ALIASES'])
+        return self._replica
+
+    def use_primary(self):
+        if (self.wrote or self.pinned
+                or self.request.method not in SAFE_METHODS):
+            return True
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return True
+        if self.sticky is None:
+            user = get_known_user(self.request)
+            if user is None:
+                return False
+            self.sticky = bool(caches[self.config['CACHE']].get(
+                STICKY_KEY.format(user_id=user.pk)
+            ))
+        return self.sticky
+
+
+class ReplicaRouter:
+    """Чтение в безопасных запросах - с реплик, запись - в `default`.
+
+    Реплики - алиасы из `DATABASE_REPLICAS['ALIASES']`. На основную БД
+    идут запросы с небезопасными методами, чтение после записи, внутри
+    транзакции и после `pin_primary()`, а также чтение пользователя
+    в течение `MAX_LAG` секунд после его записи (read-your-writes).
+    Вне HTTP-запросов (команды, воркеры) роутер ничего не выбирает,
+    и все идет в `default`.
+    Состояние запроса заводит ReplicaRoutingMiddleware.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = current_state.get()
+        if state is None:
+            return None
+        # Явный `default`, а не None: иначе Django возьмет БД объекта
+        # из подсказки `instance`, которая может быть репликой.
+        if state.use_primary():
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = current_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики - копии основной БД.
+        return True
+
+
+def iter_with_state(content, state):
+    """Отдает части потокового ответа с состоянием запроса.
+
+    Тело StreamingHttpResponse читается уже после middleware: без
+    состояния его строки шли бы с основной БД, а `count` и ссылки
+    ответа уже посчитаны на реплике.
+    """
+    chunks = iter(content)
+    while True:
+        token = current_state.set(state)
+        try:
+            chunk = next(chunks)
+        except StopIteration:
+            return
+        finally:
+            current_state.reset(token)
+        yield chunk
+
+
+class ReplicaRoutingMiddleware:
+    """Заводит состояние ReplicaRouter на время запроса.
+
+    Для потокового ответа состояние действует и при чтении тела.
+    После запроса с записью запоминает в кэше, что чтение этого
+    пользователя еще `MAX_LAG` секунд идет с основной БД.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = get_replica_settings()
+        if not config['ALIASES']:
+            return self.get_response(request)
+        state = RoutingState(request, config)
+        token = current_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_state.reset(token)
+        if response.streaming:
+            response.streaming_content = iter_with_state(
+                response.streaming_content, state
+            )
+        user = get_known_user(request)
+        if state.wrote and user is not None:
+            caches[config['CACHE']].set(
+                STICKY_KEY.format(user_id=user.pk), True,
+                config['MAX_LAG']
+            )
+        return response
@@ -29,6 +29,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api_yamdb.routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -54,13 +55,77 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
+# api_yamdb.sqlite - SQLite с WAL и PRAGMA из `pragmas` (см.
+# api_yamdb/sqlite/base.py) и BEGIN IMMEDIATE в транзакциях. Соединение
+# живет CONN_MAX_AGE секунд, а не переоткрывается на каждый запрос.
+# Сравнить с настройками по умолчанию: `manage.py benchmark_sqlite`.
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'api_yamdb.sqlite',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {
+            'timeout': 20,
+            'pragmas': {
+                'busy_timeout': 20000,
+                'cache_size': -64000,
+                'mmap_size': 268435456,
+            },
+        },
     }
 }
 
+# Чтение в GET-запросах API можно отдать репликам: перечислите их
+# алиасы из DATABASES в ALIASES. Реплики должны быть копиями `default`
+# (для локальной проверки - отдельные файлы SQLite, для тестов -
+# 'TEST': {'MIRROR': 'default'}). MAX_LAG - сколько секунд после записи
+# пользователь и изменившиеся модели читаются с основной БД; CACHE -
+# кэш, где хранятся эти отметки (общий для всех воркеров).
+DATABASE_REPLICAS = {
+    'ALIASES': [],
+    'MAX_LAG': 5,
+    'CACHE': 'default',
+}
+
+DATABASE_ROUTERS = ['api_yamdb.routers.ReplicaRouter']
+
+# Кэш ответов и счетчики версий общие для всех процессов хоста (воркеры,
+# management-команды): запись в одном процессе сбрасывает ответы во всех.
+# На нескольких хостах - общий Redis или Memcached. Кэш пользователей
+# `auth` свой у процесса: устаревшие записи отсекают отметки изменения
+# из `AUTH_REVOCATION_STORE`.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'default',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+    'auth': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'auth',
+        'TIMEOUT': 300,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    },
+}
+
+API_RESPONSE_CACHE = 'default'
+
+# Страховка на случай пропущенного сброса версии (правка БД в обход
+# моделей): кэшированный ответ живет не дольше этого числа секунд.
+API_RESPONSE_CACHE_TIMEOUT = 600
+
+AUTH_USER_CACHE = 'auth'
+
+# Отметки изменения пользователей, после которых старые токены
+# не доверяются claims. Хранилище общее для воркеров хоста и не
+# вытесняет записи: каждая живет не дольше access-токена, истекшие
+# периодически удаляются. На нескольких хостах - свой класс с методами
+# get() и set() поверх общего сервера (например, Redis с noeviction).
+AUTH_REVOCATION_STORE = {
+    'BACKEND': 'api.authentication.SQLiteRevocationStore',
+    'OPTIONS': {'path': BASE_DIR / 'revocations.sqlite3'},
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -94,7 +159,17 @@ AUTH_USER_MODEL = 'reviews.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.ClaimsJWTAuthentication',
+    ],
+
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
@@ -103,6 +178,30 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
     ),
+
+    # Число доверенных прокси перед приложением: IP для лимитов берется
+    # из X-Forwarded-For только на столько адресов справа. При 0 -
+    # REMOTE_ADDR, иначе клиент подменит IP своим заголовком.
+    'NUM_PROXIES': 0,
+
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': '30/min',
+        'auth_username': '10/min',
+    },
+}
+
+# Кодировщик JSON для FastJSONRenderer и FastJSONParser: 'orjson'
+# (если пакет установлен) или 'json' - только стандартная библиотека.
+API_JSON_BACKEND = 'orjson'
+
+# Хранилище корзин для ограничения запросов к auth-эндпоинтам.
+# LocalBucketStore держит их в памяти процесса; при нескольких воркерах
+# используйте общий 'api.throttling.SQLiteBucketStore' с
+# 'OPTIONS': {'path': BASE_DIR / 'throttle.sqlite3'} или свой класс
+# с методом consume() поверх сервера кэша.
+AUTH_THROTTLE_STORE = {
+    'BACKEND': 'api.throttling.LocalBucketStore',
+    'OPTIONS': {'max_entries': 10000},
 }
 
 SIMPLE_JWT = {
@@ -116,3 +215,7 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 DEFAULT_FROM_EMAIL = 'from@example.com'
+
+# Письма уходят через очередь OutgoingEmail и `manage.py run_mail_worker`.
+# True - отправлять сразу после фиксации транзакции (включается в тестах).
+MAIL_OUTBOX_EAGER = False
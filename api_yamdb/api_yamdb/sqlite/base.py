@@ -0,0 +1,42 @@
+from django.db.backends.sqlite3 import base
+
+# Значения по умолчанию для `OPTIONS['pragmas']`: WAL пускает чтение
+# параллельно с записью, synchronous=NORMAL в WAL не теряет целостность
+# при сбое процесса, busy_timeout ждет блокировку вместо ошибки
+# "database is locked".
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 134217728,
+    'temp_store': 'MEMORY',
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Бэкенд SQLite с PRAGMA и блокировкой записи в начале транзакции.
+
+    `OPTIONS['pragmas']` дополняет и переопределяет DEFAULT_PRAGMAS,
+    они выполняются при каждом новом соединении (с CONN_MAX_AGE -
+    раз на соединение воркера). `OPTIONS['transaction_mode']` -
+    режим BEGIN для atomic(): по умолчанию IMMEDIATE, чтобы
+    транзакция сразу ждала блокировку записи по busy_timeout. При
+    DEFERRED транзакция, которая сначала читает, а потом пишет,
+    получает "database is locked" без ожидания, если другая уже пишет.
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = {**DEFAULT_PRAGMAS, **params.pop('pragmas', {})}
+        self.transaction_mode = params.pop('transaction_mode', 'IMMEDIATE')
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute(f'BEGIN {self.transaction_mode}')
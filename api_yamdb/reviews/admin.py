@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import User, Category, Genre, Title, Review, Comment
+from .models import (User, Category, Genre, Title, Review, Comment,
+                     OutgoingEmail)
 
 
 @admin.register(User)
@@ -27,6 +28,7 @@ class TitleAdmin(admin.ModelAdmin):
     list_display = ('name', 'year', 'category')
     search_fields = ('name', 'category__name')
     list_filter = ('category', 'year')
+    readonly_fields = ('rating_sum', 'rating_count')
 
 
 @admin.register(Review)
@@ -41,3 +43,10 @@ class CommentAdmin(admin.ModelAdmin):
     list_display = ('author', 'review', 'pub_date')
     search_fields = ('author__username', 'review__title__name')
     list_filter = ('pub_date',)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'status', 'attempts', 'send_after')
+    search_fields = ('to',)
+    list_filter = ('status',)
@@ -0,0 +1,78 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import FastJSONRenderer, orjson
+
+
+def title_page(size):
+    return {
+        'next': 'http://testserver/api/v1/titles/?cursor=eyJwIjpbMTAwXX0',
+        'previous': None,
+        'results': [
+            {'id': idx, 'name': f'Произведение {idx}',
+             'year': 1900 + idx % 120,
+             'description': 'Описание произведения ' * 5,
+             'genre': [{'name': 'Драма', 'slug': 'drama'},
+                       {'name': 'Комедия', 'slug': 'comedy'}],
+             'category': {'name': 'Фильм', 'slug': 'movie'},
+             'rating': (idx % 10 + 1) / 3 if idx % 7 else None}
+            for idx in range(size)
+        ],
+    }
+
+
+def review_page(size):
+    return {
+        'count': size * 10,
+        'next': 'http://testserver/api/v1/titles/1/reviews/?page=2',
+        'previous': None,
+        'results': [
+            {'id': idx, 'text': 'Текст отзыва. ' * 40,
+             'author': f'user_{idx % 50}', 'score': idx % 10 + 1,
+             'pub_date': f'2024-01-{idx % 28 + 1:02d}T12:00:00.{idx:06d}Z'}
+            for idx in range(size)
+        ],
+    }
+
+
+class Command(BaseCommand):
+    """Сравнивает время кодирования больших страниц JSON-рендерерами."""
+
+    help = ('Замеряет JSONRenderer и FastJSONRenderer (orjson и stdlib) '
+            'на страницах произведений и отзывов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=1000,
+                            help='Элементов на странице.')
+        parser.add_argument('--repeat', type=int, default=50,
+                            help='Повторов на каждый замер.')
+
+    def handle(self, *args, **options):
+        renderers = [('JSONRenderer', JSONRenderer, 'json')]
+        renderers.append(('FastJSONRenderer (stdlib)', FastJSONRenderer,
+                          'json'))
+        if orjson is not None:
+            renderers.append(('FastJSONRenderer (orjson)', FastJSONRenderer,
+                              'orjson'))
+        for page_name, build in (('titles', title_page),
+                                 ('reviews', review_page)):
+            data = build(options['page_size'])
+            baseline = None
+            for name, renderer_class, backend in renderers:
+                with override_settings(API_JSON_BACKEND=backend):
+                    renderer = renderer_class()
+                    timings = []
+                    for _ in range(options['repeat']):
+                        started = time.perf_counter()
+                        content = renderer.render(data)
+                        timings.append(time.perf_counter() - started)
+                median = statistics.median(timings) * 1000
+                baseline = baseline or median
+                self.stdout.write(
+                    f'{page_name:8} {name:28} {median:8.2f} мс '
+                    f'x{baseline / median:4.1f} ({len(content)} байт)'
+                )
@@ -0,0 +1,139 @@
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, OperationalError
+from django.db.utils import ConnectionHandler
+
+# Отдельный ConnectionHandler, с соединениями проекта не пересекается.
+ALIAS = DEFAULT_DB_ALIAS
+
+SCHEMA_SQL = (
+    'CREATE TABLE title (id INTEGER PRIMARY KEY, '
+    'rating_sum INTEGER NOT NULL, rating_count INTEGER NOT NULL)',
+    'CREATE TABLE review (id INTEGER PRIMARY KEY, '
+    'title_id INTEGER NOT NULL, author INTEGER NOT NULL, '
+    'score INTEGER NOT NULL, text TEXT NOT NULL)',
+    'CREATE UNIQUE INDEX review_title_author ON review (title_id, author)',
+)
+TITLES = 50
+
+
+def post_review(connection, author, title_id, score):
+    """Запросы создания отзыва: проверка, INSERT и пересчет рейтинга.
+
+    Транзакция открывается так же, как в transaction.atomic().
+    """
+    connection.set_autocommit(
+        False, force_begin_transaction_with_broken_autocommit=True
+    )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT 1 FROM review WHERE title_id = %s AND author = %s',
+                (title_id, author)
+            )
+            if cursor.fetchone() is None:
+                cursor.execute(
+                    'INSERT INTO review (title_id, author, score, text) '
+                    'VALUES (%s, %s, %s, %s)',
+                    (title_id, author, score, 'Текст отзыва. ' * 20)
+                )
+                cursor.execute(
+                    'UPDATE title SET rating_sum = rating_sum + %s, '
+                    'rating_count = rating_count + 1 WHERE id = %s',
+                    (score, title_id)
+                )
+        connection.commit()
+    except BaseException:
+        connection.rollback()
+        raise
+    finally:
+        connection.set_autocommit(True)
+
+
+class Command(BaseCommand):
+    """Сравнивает параллельную запись в SQLite с разными настройками."""
+
+    help = ('Замеряет пропускную способность параллельного создания '
+            'отзывов: sqlite3 по умолчанию с соединением на запрос '
+            'и профиль из settings.DATABASES (WAL, PRAGMA, '
+            'постоянные соединения).')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8,
+                            help='Параллельных писателей.')
+        parser.add_argument('--operations', type=int, default=200,
+                            help='Отзывов на одного писателя.')
+
+    def handle(self, *args, **options):
+        profiles = (
+            ('sqlite3 по умолчанию', {
+                'ENGINE': 'django.db.backends.sqlite3',
+                'CONN_MAX_AGE': 0,
+            }),
+            ('settings.DATABASES', {
+                key: value
+                for key, value in settings.DATABASES['default'].items()
+                if key in ('ENGINE', 'OPTIONS', 'CONN_MAX_AGE')
+            }),
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            for number, (name, config) in enumerate(profiles):
+                path = Path(directory) / f'benchmark_{number}.sqlite3'
+                elapsed, done, failed = self.run_profile(
+                    {**config, 'NAME': path}, options
+                )
+                self.stdout.write(
+                    f'{name:22} {done / elapsed:9.1f} отзывов/с, '
+                    f'ошибок "database is locked": {failed} '
+                    f'({elapsed:.2f} с)'
+                )
+
+    def run_profile(self, config, options):
+        handler = ConnectionHandler({ALIAS: config})
+        connection = handler[ALIAS]
+        with connection.cursor() as cursor:
+            for sql in SCHEMA_SQL:
+                cursor.execute(sql)
+            cursor.executemany(
+                'INSERT INTO title (id, rating_sum, rating_count) '
+                'VALUES (%s, 0, 0)',
+                [(title_id,) for title_id in range(1, TITLES + 1)]
+            )
+        connection.close()
+        counters = {'done': 0, 'failed': 0}
+        lock = threading.Lock()
+
+        def writer(index):
+            # Соединения ConnectionHandler свои у каждого потока.
+            connection = handler[ALIAS]
+            done = failed = 0
+            for number in range(options['operations']):
+                # Каждый отзыв - новая пара (произведение, автор).
+                author = index * options['operations'] + number
+                try:
+                    post_review(connection, author, number % TITLES + 1,
+                                number % 10 + 1)
+                    done += 1
+                except OperationalError:
+                    failed += 1
+                # Как close_old_connections() в конце запроса.
+                connection.close_if_unusable_or_obsolete()
+            connection.close()
+            with lock:
+                counters['done'] += done
+                counters['failed'] += failed
+
+        threads = [threading.Thread(target=writer, args=(index,))
+                   for index in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return (time.perf_counter() - started, counters['done'],
+                counters['failed'])
@@ -0,0 +1,199 @@
+import csv
+import time
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import IntegrityError, connection, transaction
+from django.utils.dateparse import parse_datetime
+
+from api.cache import bump_version
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.search import normalize_search_text
+
+TitleGenre = Title.genre.through
+
+
+def build_user(row):
+    return User(
+        id=row['id'], username=row['username'], email=row['email'],
+        role=row['role'] or User.Role.USER, bio=row['bio'],
+        first_name=row['first_name'], last_name=row['last_name'],
+        password=make_password(None),
+    )
+
+
+def build_category_or_genre(model):
+    def build(row):
+        return model(id=row['id'], name=row['name'], slug=row['slug'],
+                     name_search=normalize_search_text(row['name']))
+    return build
+
+
+def build_title(row):
+    return Title(
+        id=row['id'], name=row['name'], year=row['year'] or None,
+        description=row.get('description') or None,
+        category_id=row['category'] or None,
+        name_search=normalize_search_text(row['name']),
+    )
+
+
+def build_title_genre(row):
+    return TitleGenre(id=row['id'], title_id=row['title_id'],
+                      genre_id=row['genre_id'])
+
+
+def build_review(row):
+    return Review(
+        id=row['id'], title_id=row['title_id'], text=row['text'],
+        author_id=row['author'], score=row['score'],
+        pub_date=parse_datetime(row['pub_date']),
+    )
+
+
+def build_comment(row):
+    return Comment(
+        id=row['id'], review_id=row['review_id'], text=row['text'],
+        author_id=row['author'], pub_date=parse_datetime(row['pub_date']),
+    )
+
+
+# Файл, модель, сборщик объекта и внешние ключи: колонка CSV -> модель.
+# Порядок списка - порядок импорта по зависимостям.
+IMPORT_ORDER = (
+    ('users.csv', User, build_user, {}),
+    ('category.csv', Category, build_category_or_genre(Category), {}),
+    ('genre.csv', Genre, build_category_or_genre(Genre), {}),
+    ('titles.csv', Title, build_title, {'category': Category}),
+    ('genre_title.csv', TitleGenre, build_title_genre,
+     {'title_id': Title, 'genre_id': Genre}),
+    ('review.csv', Review, build_review,
+     {'title_id': Title, 'author': User}),
+    ('comments.csv', Comment, build_comment,
+     {'review_id': Review, 'author': User}),
+)
+
+
+@contextmanager
+def keep_pub_date(model):
+    """Отключает auto_now_add, чтобы bulk_create сохранил даты из CSV."""
+    fields = [field for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    """Загружает данные из CSV-файлов static/data в БД."""
+
+    help = ('Импортирует CSV из static/data пакетами bulk_create '
+            'в одной транзакции, в порядке зависимостей моделей.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', type=Path,
+            default=Path(settings.BASE_DIR) / 'static' / 'data',
+            help='Каталог с CSV-файлами.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Размер пакета bulk_create и проверки внешних ключей.'
+        )
+        parser.add_argument(
+            '--ignore-conflicts', action='store_true',
+            help='Пропускать строки, которые уже есть в БД.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not path.is_dir():
+            raise CommandError(f'Каталог {path} не найден.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть больше 0.')
+
+        with transaction.atomic():
+            for filename, model, build, foreign_keys in IMPORT_ORDER:
+                file_path = path / filename
+                if not file_path.exists():
+                    self.stdout.write(f'{filename}: нет файла, пропущен')
+                    continue
+                self.import_file(file_path, model, build, foreign_keys,
+                                 options)
+            models = [model for _, model, _, _ in IMPORT_ORDER]
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(),
+                                                             models):
+                    cursor.execute(sql)
+            call_command('rebuild_ratings', stdout=self.stdout)
+
+        # bulk_create не отправляет сигналы: сбрасываем кэш ответов явно.
+        for model in (User, Category, Genre, Title, Review, Comment):
+            bump_version(model)
+
+    def import_file(self, file_path, model, build, foreign_keys, options):
+        started = time.perf_counter()
+        # С ignore_conflicts bulk_create не сообщает, сколько строк
+        # вставлено: считаем по числу строк в таблице.
+        count_before = model.objects.count()
+        total = 0
+        with open(file_path, encoding='utf-8', newline='') as csv_file:
+            rows = csv.DictReader(csv_file)
+            with keep_pub_date(model):
+                while True:
+                    batch = list(islice(rows, options['batch_size']))
+                    if not batch:
+                        break
+                    total += len(batch)
+                    valid = self.filter_foreign_keys(batch, foreign_keys)
+                    try:
+                        model.objects.bulk_create(
+                            map(build, valid),
+                            batch_size=options['batch_size'],
+                            ignore_conflicts=options['ignore_conflicts'],
+                        )
+                    except IntegrityError as error:
+                        raise CommandError(
+                            f'{file_path.name}: строки конфликтуют с уже '
+                            f'загруженными ({error}). Запустите команду '
+                            f'с --ignore-conflicts, чтобы пропустить их.'
+                        ) from error
+        created = model.objects.count() - count_before
+        skipped = total - created
+        elapsed = time.perf_counter() - started
+        rate = created / elapsed if elapsed else created
+        self.stdout.write(self.style.SUCCESS(
+            f'{file_path.name}: {created} строк за {elapsed:.2f} с '
+            f'({rate:.0f} строк/с), пропущено {skipped}'
+        ))
+
+    @staticmethod
+    def filter_foreign_keys(batch, foreign_keys):
+        """Отбрасывает строки со ссылками на несуществующие объекты.
+
+        Существующие id ищутся одним запросом на внешний ключ и пакет,
+        поэтому память не растет с размером таблиц-родителей.
+        """
+        chunk_size = connection.features.max_query_params or len(batch)
+        for column, parent in foreign_keys.items():
+            ids = list({row[column] for row in batch if row[column]})
+            found = set()
+            for start in range(0, len(ids), chunk_size):
+                found.update(
+                    str(pk) for pk in parent.objects.filter(
+                        pk__in=ids[start:start + chunk_size]
+                    ).values_list('pk', flat=True)
+                )
+            batch = [row for row in batch
+                     if not row[column] or row[column] in found]
+        return batch
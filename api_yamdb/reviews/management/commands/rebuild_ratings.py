@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from api.cache import bump_version
+from reviews.models import Review, Title
+
+
+class Command(BaseCommand):
+    """Пересчитывает сумму и количество оценок всех произведений."""
+
+    help = ('Пересчитывает рейтинги произведений по таблице отзывов. '
+            'Нужен после ручных правок БД в обход моделей.')
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        reviews = (Review.objects.filter(title=OuterRef('pk'))
+                   .order_by().values('title'))
+        updated = Title.objects.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score'))
+                         .values('total')), 0
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('id'))
+                         .values('total')), 0
+            ),
+        )
+        # update() не отправляет сигналы: ответы с рейтингом сбрасываем сами.
+        transaction.on_commit(lambda: bump_version(Title))
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано произведений: {updated}')
+        )
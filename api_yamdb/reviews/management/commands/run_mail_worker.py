@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews.outbox import MAX_ATTEMPTS, claim_batch, deliver
+
+
+class Command(BaseCommand):
+    """Отправляет письма из очереди OutgoingEmail."""
+
+    help = ('Разбирает очередь исходящих писем пачками через одно '
+            'соединение с почтовым сервером, с повторами и задержкой.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Сколько писем отправлять через одно соединение.'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Пауза в секундах, когда очередь пуста.'
+        )
+        parser.add_argument(
+            '--max-attempts', type=int, default=MAX_ATTEMPTS,
+            help='После стольких неудач письмо помечается как failed.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            batch = claim_batch(options['batch_size'])
+            if batch:
+                try:
+                    sent = deliver(batch, options['max_attempts'])
+                except OSError as error:
+                    # Сервер недоступен: письма вернутся в очередь
+                    # по истечении аренды.
+                    self.stderr.write(f'Ошибка соединения: {error!r}')
+                else:
+                    self.stdout.write(
+                        f'Отправлено {sent} из {len(batch)} писем'
+                    )
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
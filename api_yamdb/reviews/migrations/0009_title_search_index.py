@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from reviews.search import create_title_search_index, drop_title_search_index
+
+
+def create_index(apps, schema_editor):
+    create_title_search_index(schema_editor)
+
+
+def drop_index(apps, schema_editor):
+    drop_title_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
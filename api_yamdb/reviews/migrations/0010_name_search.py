@@ -0,0 +1,47 @@
+# Generated by Django 3.2 on 2026-10-17 07:04
+
+from django.db import migrations, models
+
+from reviews.search import create_title_search_index, normalize_search_text
+
+
+def fill_name_search(apps, schema_editor):
+    for model_name in ('Category', 'Genre', 'Title'):
+        model = apps.get_model('reviews', model_name)
+        objs = list(model.objects.only('id', 'name'))
+        for obj in objs:
+            obj.name_search = normalize_search_text(obj.name)
+        model.objects.bulk_update(objs, ['name_search'], batch_size=1000)
+
+
+def restore_title_search_index(apps, schema_editor):
+    # AddField на SQLite пересоздает reviews_title вместе с триггерами.
+    create_title_search_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='name_search',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=256, verbose_name='Название для поиска'),
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='name_search',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=256, verbose_name='Название для поиска'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='name_search',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=256, verbose_name='Название для поиска'),
+        ),
+        migrations.RunPython(restore_title_search_index,
+                             migrations.RunPython.noop),
+        migrations.RunPython(fill_name_search, migrations.RunPython.noop),
+    ]
@@ -3,11 +3,13 @@ import uuid
 from django.contrib.auth.models import AbstractUser, Group, Permission
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
-from django.db.models import Avg
+from django.db.models import F
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 from api.validators import validate_year
-from api_yamdb.models import BaseModelCategoryGenre, BaseModelReviewComment
+from api_yamdb.models import (BaseModelCategoryGenre, BaseModelReviewComment,
+                              NormalizedNameModel)
 
 
 class User(AbstractUser):
@@ -51,6 +53,9 @@ class User(AbstractUser):
         verbose_name = 'пользователь'
         verbose_name_plural = 'Пользователи'
         ordering = ('role', 'id')
+        indexes = [
+            models.Index(fields=('role', 'id'), name='user_role_id_idx'),
+        ]
 
 
 class Category(BaseModelCategoryGenre):
@@ -60,6 +65,10 @@ class Category(BaseModelCategoryGenre):
         verbose_name = 'категория'
         verbose_name_plural = 'Категории'
         ordering = ('name', 'slug')
+        indexes = [
+            models.Index(fields=('name', 'slug'),
+                         name='category_name_slug_idx'),
+        ]
 
 
 class Genre(BaseModelCategoryGenre):
@@ -69,9 +78,13 @@ class Genre(BaseModelCategoryGenre):
         verbose_name = 'жанр'
         verbose_name_plural = 'Жанры'
         ordering = ('name', 'slug')
+        indexes = [
+            models.Index(fields=('name', 'slug'),
+                         name='genre_name_slug_idx'),
+        ]
 
 
-class Title(models.Model):
+class Title(NormalizedNameModel):
     """Модель произведений"""
 
     name = models.CharField(max_length=256, verbose_name='Название')
@@ -98,18 +111,43 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Категория'
     )
+    rating_sum = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Сумма оценок'
+    )
+    rating_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество оценок'
+    )
 
     class Meta:
         verbose_name = 'произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('id', 'name', 'year')
+        indexes = [
+            models.Index(fields=('year', 'id'), name='title_year_id_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        """Средний рейтинг по хранимым сумме и количеству оценок."""
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
     def get_rating(self):
-        """Вычисляет средний рейтинг произведения."""
-        return self.reviews.aggregate(Avg('score'))['score__avg']
+        """Возвращает средний рейтинг произведения без запроса к БД."""
+        return self.rating
+
+    def update_rating(self, score_delta, count_delta=0):
+        """Атомарно сдвигает сумму и количество оценок произведения."""
+        Title.objects.filter(pk=self.pk).update(
+            rating_sum=F('rating_sum') + score_delta,
+            rating_count=F('rating_count') + count_delta
+        )
 
 
 class Review(BaseModelReviewComment):
@@ -138,6 +176,24 @@ class Review(BaseModelReviewComment):
         ]
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        review = super().from_db(db, field_names, values)
+        review.remember_rating()
+        return review
+
+    def remember_rating(self):
+        """Запоминает произведение и оценку, учтенные в рейтинге.
+
+        По ним сигналы `reviews.signals` считают сдвиг рейтинга при
+        сохранении; если поля отложены (defer), сохраняется None.
+        """
+        loaded = self.__dict__
+        if 'title_id' in loaded and 'score' in loaded:
+            self._rated = (self.title_id, self.score)
+        else:
+            self._rated = None
+
     class Meta:
         verbose_name = 'отзыв'
         verbose_name_plural = 'Отзывы'
@@ -145,7 +201,13 @@ class Review(BaseModelReviewComment):
             models.UniqueConstraint(fields=('author', 'title'),
                                     name='unique_author_title')
         ]
-        ordering = ('pub_date', 'author')
+        indexes = [
+            models.Index(fields=('title', 'pub_date', 'author'),
+                         name='review_title_pub_date_idx'),
+        ]
+        # author_id, а не author: иначе порядок берется из Meta.ordering
+        # пользователя (JOIN и сортировка мимо индекса).
+        ordering = ('pub_date', 'author_id')
 
 
 class Comment(BaseModelReviewComment):
@@ -167,4 +229,48 @@ class Comment(BaseModelReviewComment):
     class Meta:
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
-        ordering = ('pub_date', 'author')
+        indexes = [
+            models.Index(fields=('review', 'pub_date', 'author'),
+                         name='comment_review_pub_date_idx'),
+        ]
+        ordering = ('pub_date', 'author_id')
+
+
+class OutgoingEmail(models.Model):
+    """Очередь исходящих писем, которую разбирает run_mail_worker."""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', _('Pending')
+        SENT = 'sent', _('Sent')
+        FAILED = 'failed', _('Failed')
+
+    subject = models.CharField(max_length=255, verbose_name='Тема')
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.CharField(max_length=254, verbose_name='Отправитель')
+    to = models.TextField(verbose_name='Получатели через запятую')
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING,
+        verbose_name='Статус'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток отправки'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Последняя ошибка')
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    send_after = models.DateTimeField('Отправить после', default=timezone.now)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('send_after', 'id')
+        indexes = [
+            models.Index(fields=('status', 'send_after'),
+                         name='outgoing_email_queue_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} -> {self.to}'
@@ -0,0 +1,114 @@
+"""Очередь исходящих писем (transactional outbox).
+
+Письмо записывается в таблицу в той же транзакции, что и данные,
+а отправляет его `manage.py run_mail_worker` пачками через одно
+SMTP-соединение с повторами и экспоненциальной задержкой.
+При `MAIL_OUTBOX_EAGER` письмо отправляется сразу после фиксации
+транзакции - для тестов и разработки без воркера.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from reviews.models import OutgoingEmail
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+# На это время письмо закрепляется за воркером, взявшим его в работу.
+LEASE = timedelta(minutes=5)
+
+
+def enqueue_mail(subject, body, recipients, from_email=None):
+    """Ставит письмо в очередь; вызывать внутри транзакции с данными."""
+    email = OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=','.join(recipients),
+    )
+    if settings.MAIL_OUTBOX_EAGER:
+        transaction.on_commit(lambda: deliver_eager(email))
+    return email
+
+
+def deliver_eager(email):
+    """Отправляет письмо сразу после фиксации транзакции.
+
+    Письмо сначала закрепляется, как в `claim_batch`, чтобы воркер
+    не отправил его второй раз. Ошибка отправки не доходит до
+    запроса: данные уже зафиксированы, а письмо вернется в очередь
+    с задержкой.
+    """
+    if not claim(email):
+        return
+    try:
+        deliver([email])
+    except Exception as error:
+        mark_failed(email, error, MAX_ATTEMPTS)
+
+
+def get_backoff(attempts):
+    return min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+
+
+def claim(email):
+    """Закрепляет письмо на время `LEASE`; False, если его уже взяли.
+
+    Условный UPDATE по старому `send_after`: из параллельных
+    отправителей письмо достанется только одному.
+    """
+    return bool(OutgoingEmail.objects.filter(
+        pk=email.pk, status=OutgoingEmail.Status.PENDING,
+        send_after=email.send_after
+    ).update(send_after=timezone.now() + LEASE))
+
+
+def claim_batch(batch_size):
+    """Забирает готовые к отправке письма."""
+    candidates = OutgoingEmail.objects.filter(
+        status=OutgoingEmail.Status.PENDING, send_after__lte=timezone.now()
+    ).order_by('send_after', 'id')[:batch_size]
+    return [email for email in candidates if claim(email)]
+
+
+def deliver(emails, max_attempts=MAX_ATTEMPTS):
+    """Отправляет письма через одно соединение, возвращает число успешных."""
+    if not emails:
+        return 0
+    sent = 0
+    connection = get_connection()
+    try:
+        connection.open()
+        for email in emails:
+            message = EmailMessage(email.subject, email.body,
+                                   email.from_email, email.to.split(','),
+                                   connection=connection)
+            try:
+                message.send()
+            except Exception as error:
+                mark_failed(email, error, max_attempts)
+            else:
+                OutgoingEmail.objects.filter(pk=email.pk).update(
+                    status=OutgoingEmail.Status.SENT,
+                    sent_at=timezone.now(),
+                    attempts=email.attempts + 1,
+                    last_error='',
+                )
+                sent += 1
+    finally:
+        connection.close()
+    return sent
+
+
+def mark_failed(email, error, max_attempts):
+    attempts = email.attempts + 1
+    update = {'attempts': attempts, 'last_error': repr(error)}
+    if attempts >= max_attempts:
+        update['status'] = OutgoingEmail.Status.FAILED
+    else:
+        update['send_after'] = timezone.now() + get_backoff(attempts)
+    OutgoingEmail.objects.filter(pk=email.pk).update(**update)
@@ -0,0 +1,118 @@
+"""Поиск произведений: FTS5-индекс и нормализованные названия.
+
+Индекс - внешняя (external content) FTS5-таблица над `reviews_title`,
+которую синхронизируют триггеры на вставку, изменение и удаление.
+Так в индекс попадают и `save()`, и `bulk_create()`, и `update()`.
+SQLite пересоздает таблицу при AddField/AlterField, и триггеры теряются,
+поэтому такие миграции `Title` должны снова вызвать
+`create_title_search_index`.
+
+Для поиска по началу названия служат нормализованные колонки
+`name_search` (см. `normalize_search_text`).
+"""
+import re
+
+TITLE_TABLE = 'reviews_title'
+TITLE_FTS_TABLE = 'reviews_title_fts'
+
+TITLE_FTS_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TITLE_FTS_TABLE} USING fts5("
+    f"name, description, content='{TITLE_TABLE}', content_rowid='id', "
+    f"tokenize='unicode61 remove_diacritics 2')",
+)
+TITLE_FTS_TRIGGERS_SQL = (
+    f'CREATE TRIGGER IF NOT EXISTS {TITLE_FTS_TABLE}_ai '
+    f'AFTER INSERT ON {TITLE_TABLE} BEGIN '
+    f'INSERT INTO {TITLE_FTS_TABLE}(rowid, name, description) '
+    f'VALUES (new.id, new.name, new.description); END',
+    f'CREATE TRIGGER IF NOT EXISTS {TITLE_FTS_TABLE}_ad '
+    f'AFTER DELETE ON {TITLE_TABLE} BEGIN '
+    f'INSERT INTO {TITLE_FTS_TABLE}'
+    f'({TITLE_FTS_TABLE}, rowid, name, description) '
+    f"VALUES ('delete', old.id, old.name, old.description); END",
+    f'CREATE TRIGGER IF NOT EXISTS {TITLE_FTS_TABLE}_au '
+    f'AFTER UPDATE OF name, description ON {TITLE_TABLE} BEGIN '
+    f'INSERT INTO {TITLE_FTS_TABLE}'
+    f'({TITLE_FTS_TABLE}, rowid, name, description) '
+    f"VALUES ('delete', old.id, old.name, old.description); "
+    f'INSERT INTO {TITLE_FTS_TABLE}(rowid, name, description) '
+    f'VALUES (new.id, new.name, new.description); END',
+)
+TITLE_FTS_REBUILD_SQL = (
+    f"INSERT INTO {TITLE_FTS_TABLE}({TITLE_FTS_TABLE}) VALUES ('rebuild')"
+)
+TITLE_FTS_DROP_SQL = (
+    f'DROP TRIGGER IF EXISTS {TITLE_FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {TITLE_FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {TITLE_FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {TITLE_FTS_TABLE}',
+)
+
+# Подзапрос id подходящих произведений и ранг совпадения для строки.
+TITLE_FTS_MATCH_SQL = (
+    f'SELECT rowid FROM {TITLE_FTS_TABLE} WHERE {TITLE_FTS_TABLE} MATCH %s'
+)
+TITLE_FTS_RANK_SQL = (
+    f'SELECT rank FROM {TITLE_FTS_TABLE} '
+    f'WHERE {TITLE_FTS_TABLE} MATCH %s '
+    f'AND rowid = "{TITLE_TABLE}"."id"'
+)
+
+WORD_RE = re.compile(r'\w+')
+# Верхняя граница диапазона для поиска по префиксу.
+PREFIX_UPPER_BOUND = chr(0x10FFFF)
+
+
+def fts_supported(connection):
+    return connection.vendor == 'sqlite'
+
+
+def create_title_search_index(schema_editor):
+    """Создает FTS-таблицу и триггеры и заполняет индекс."""
+    if not fts_supported(schema_editor.connection):
+        return
+    for sql in TITLE_FTS_SQL + TITLE_FTS_TRIGGERS_SQL:
+        schema_editor.execute(sql)
+    schema_editor.execute(TITLE_FTS_REBUILD_SQL)
+
+
+def drop_title_search_index(schema_editor):
+    if not fts_supported(schema_editor.connection):
+        return
+    for sql in TITLE_FTS_DROP_SQL:
+        schema_editor.execute(sql)
+
+
+def build_match_query(text, column=None):
+    """Превращает пользовательский ввод в безопасный запрос FTS5.
+
+    Каждое слово ищется как префикс, все слова обязательны.
+    Возвращает None, если в вводе нет ни одного слова.
+    """
+    words = WORD_RE.findall(text)
+    if not words:
+        return None
+    query = ' '.join(f'"{word}"*' for word in words)
+    if column:
+        return f'{column} : ({query})'
+    return query
+
+
+def normalize_search_text(value):
+    """Приводит строку к виду для поиска: casefold, ё -> е, один пробел."""
+    if not value:
+        return ''
+    return ' '.join(value.casefold().replace('ё', 'е').split())
+
+
+def prefix_lookup(field_name, value):
+    """Условия поиска по началу нормализованной колонки.
+
+    Диапазон `>= prefix AND < prefix + U+10FFFF` использует обычный
+    B-tree индекс на любой СУБД, в отличие от LIKE/ILIKE.
+    """
+    prefix = normalize_search_text(value)
+    return {
+        f'{field_name}__gte': prefix,
+        f'{field_name}__lt': prefix + PREFIX_UPPER_BOUND,
+    }
@@ -0,0 +1,43 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from reviews.models import Review, Title
+
+
+@receiver(pre_save, sender=Review)
+def load_rated_score(sender, instance, raw, **kwargs):
+    """Читает учтенную оценку, если объект создан не из запроса к БД."""
+    if raw or instance.pk is None or getattr(instance, '_rated', None):
+        return
+    instance._rated = (Review.objects.filter(pk=instance.pk)
+                       .values_list('title_id', 'score').first())
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw, **kwargs):
+    """Сдвигает сумму и количество оценок произведения.
+
+    Выполняется в транзакции сохранения, если она открыта (вьюсеты
+    отзывов, админка), и при любом пути записи через `save()`.
+    """
+    if raw:
+        return
+    old = None if created else getattr(instance, '_rated', None)
+    new = (instance.title_id, instance.score)
+    if old is None:
+        Title(pk=instance.title_id).update_rating(instance.score, 1)
+    elif old[0] == new[0]:
+        if old[1] != new[1]:
+            Title(pk=instance.title_id).update_rating(new[1] - old[1])
+    else:
+        Title(pk=old[0]).update_rating(-old[1], -1)
+        Title(pk=new[0]).update_rating(new[1], 1)
+    instance._rated = new
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Убирает оценку, в том числе при каскадном удалении автора."""
+    title_id, score = (getattr(instance, '_rated', None)
+                       or (instance.title_id, instance.score))
+    Title(pk=title_id).update_rating(-score, -1)
@@ -1,8 +1,13 @@
 import os
 import sys
 
+import pytest
+from django.core.cache import caches
 from django.utils.version import get_version
 
+from api.authentication import get_revocation_store
+from api.throttling import get_bucket_store
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
 
@@ -33,3 +38,49 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(scope='session', autouse=True)
+def isolated_stores(tmp_path_factory):
+    """Файловые кэши и отметки изменения - во временном каталоге.
+
+    Тесты очищают кэши перед каждым тестом и не должны трогать файлы
+    запущенного проекта или параллельного прогона тестов.
+    """
+    from django.conf import settings
+    from django.test import override_settings
+
+    directory = tmp_path_factory.mktemp('stores')
+    file_cache = 'django.core.cache.backends.filebased.FileBasedCache'
+    cache_settings = {
+        alias: ({**config, 'LOCATION': directory / alias}
+                if config['BACKEND'] == file_cache else config)
+        for alias, config in settings.CACHES.items()
+    }
+    override = override_settings(
+        CACHES=cache_settings,
+        AUTH_REVOCATION_STORE={
+            **settings.AUTH_REVOCATION_STORE,
+            'OPTIONS': {'path': directory / 'revocations.sqlite3'},
+        },
+    )
+    override.enable()
+    get_revocation_store.cache_clear()
+    yield
+    override.disable()
+    get_revocation_store.cache_clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_caches(isolated_stores):
+    """Кэш ответов и корзины лимитов не должны переживать тест."""
+    for cache in caches.all():
+        cache.clear()
+    get_bucket_store().clear()
+    get_revocation_store().clear()
+
+
+@pytest.fixture(autouse=True)
+def eager_mail(settings):
+    """Письма уходят сразу после фиксации транзакции, без воркера."""
+    settings.MAIL_OUTBOX_EAGER = True
@@ -0,0 +1,434 @@
+import os
+import subprocess
+import sys
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from api.authentication import (USER_KEY, SQLiteRevocationStore,
+                                get_access_token, get_changed,
+                                get_user_cache)
+from api.serializers import SignupSerializer
+from reviews.models import Title
+from tests.utils import (create_comments, create_reviews,
+                         create_single_review, create_titles)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def test_01_title_list_queries(self, client, admin_client,
+                                   django_assert_num_queries):
+        create_titles(admin_client)
+        extra_titles = [
+            {'name': f'Произведение {idx}', 'year': 2000,
+             'genre': ['horror', 'drama'], 'category': 'films'}
+            for idx in range(5)
+        ]
+        for data in extra_titles:
+            admin_client.post(self.TITLES_URL, data=data)
+
+        # COUNT(*), страница произведений с категориями, жанры.
+        with django_assert_num_queries(3):
+            response = client.get(f'{self.TITLES_URL}?page_size=1000')
+        assert len(response.json()['results']) == 7
+
+    def test_02_title_detail_queries(self, client, admin_client,
+                                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+
+        with django_assert_num_queries(2):
+            response = client.get(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(
+                    title_id=titles[0]['id']
+                )
+            )
+        assert len(response.json()['genre']) == 2
+
+    def test_03_title_multi_get(self, client, admin_client,
+                                django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        missing = second + 100
+
+        # Произведения с категориями и жанры - при любом числе id.
+        with django_assert_num_queries(2):
+            response = client.get(
+                f'{self.TITLES_URL}?ids={second},{missing},{first},{second}'
+            )
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [title['id'] for title in data['results']] == [
+            second, first
+        ], 'Произведения должны возвращаться в порядке `ids`.'
+        assert sorted(
+            genre['slug'] for genre in data['results'][1]['genre']
+        ) == sorted(titles[0]['genre'])
+        assert data['missing'] == [missing]
+
+        response = client.get(f'{self.TITLES_URL}?ids=1,x')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_anonymous_hit_without_queries(self, client, admin_client,
+                                              django_assert_num_queries):
+        create_titles(admin_client)
+        first = client.get(f'{self.TITLES_URL}?page_size=10&year=1984')
+        assert first['X-Cache'] == 'MISS'
+
+        with django_assert_num_queries(0):
+            second = client.get(f'{self.TITLES_URL}?year=1984&page_size=10')
+        assert second['X-Cache'] == 'HIT'
+        assert second.json() == first.json()
+
+    def test_02_writes_invalidate(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        detail_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        assert client.get(detail_url).json()['rating'] is None
+
+        user_client.post(f'{detail_url}reviews/',
+                         data={'text': 'Отлично', 'score': 8})
+        response = client.get(detail_url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['rating'] == 8
+
+        client.get('/api/v1/genres/')
+        admin_client.post('/api/v1/genres/',
+                          data={'name': 'Вестерн', 'slug': 'western'})
+        response = client.get('/api/v1/genres/')
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['count'] == 4
+
+        admin_client.patch(detail_url, data={'genre': ['drama']})
+        genres = client.get(detail_url).json()['genre']
+        assert [genre['slug'] for genre in genres] == ['drama']
+
+    def test_03_other_process_invalidates(self, client, admin_client):
+        create_titles(admin_client)
+        client.get(self.TITLES_URL)
+        assert client.get(self.TITLES_URL)['X-Cache'] == 'HIT'
+        # Запись в другом процессе (воркер, management-команда)
+        # с тем же каталогом кэша, что и у тестов.
+        subprocess.run(
+            [sys.executable, '-c',
+             'import sys, django; from django.conf import settings; '
+             'django.setup(); '
+             "settings.CACHES['default']['LOCATION'] = sys.argv[1]; "
+             'from api.cache import bump_version; '
+             'from reviews.models import Title; bump_version(Title)',
+             str(settings.CACHES['default']['LOCATION'])],
+            check=True, cwd=settings.BASE_DIR,
+            env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'api_yamdb.settings'}
+        )
+        assert client.get(self.TITLES_URL)['X-Cache'] == 'MISS', (
+            'Сброс версии в другом процессе должен сбрасывать кэш ответов.'
+        )
+
+    def test_04_rebuild_ratings_invalidates(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        detail_url = f'{self.TITLES_URL}{titles[0]["id"]}/'
+        # Правка в обход моделей: сигналы не срабатывают.
+        Title.objects.filter(pk=titles[0]['id']).update(
+            rating_sum=9, rating_count=1
+        )
+        client.get(detail_url)
+        call_command('rebuild_ratings', stdout=StringIO())
+        response = client.get(detail_url)
+        assert response['X-Cache'] == 'MISS', (
+            'rebuild_ratings должна сбрасывать кэш ответов с произведениями.'
+        )
+        assert response.json()['rating'] is None
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08ConditionalRequests:
+
+    def test_01_not_modified_without_queries(self, client, admin_client,
+                                             user_client,
+                                             django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{titles[0]["id"]}/',
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+        )
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            etag = response['ETag']
+            assert response['Last-Modified']
+            with django_assert_num_queries(0):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, url
+            assert response['ETag'] == etag
+
+    def test_02_etag_changes_on_write(self, client, admin_client,
+                                      user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = client.get(url)['ETag']
+        user_client.post(url, data={'text': 'Отлично', 'score': 8})
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response['ETag'] != etag
+        assert response.json()['count'] == 1
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08NestedRoutes:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_review_create_loads_title_once(self, admin_client, admin,
+                                               user_client,
+                                               django_assert_num_queries):
+        _, titles = create_reviews(admin_client, {admin: admin_client})
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        # Пользователь, произведение, проверка дубля, BEGIN, INSERT,
+        # обновление рейтинга.
+        with django_assert_num_queries(6):
+            response = user_client.post(url, data={'text': 'x', 'score': 3})
+        assert response.status_code == HTTPStatus.CREATED
+
+    def test_02_comment_checks_review_title(self, client, admin_client,
+                                            admin, user_client,
+                                            django_assert_num_queries):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        # Пользователь, отзыв вместе с проверкой произведения, INSERT.
+        with django_assert_num_queries(3):
+            response = user_client.post(url, data={'text': 'x'})
+        assert response.status_code == HTTPStatus.CREATED
+        comment_id = response.json()['id']
+
+        wrong_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[1]['id'], review_id=reviews[0]['id']
+        )
+        assert client.get(wrong_url).status_code == HTTPStatus.NOT_FOUND
+        response = user_client.post(wrong_url, data={'text': 'x'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = client.get(f'{wrong_url}{comment_id}/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08AuthorQueries:
+
+    def test_01_reviews_and_comments_constant_queries(
+            self, client, admin_client, admin, user_client, user,
+            moderator_client, moderator, django_assert_num_queries):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+
+        # Родитель, COUNT(*), страница вместе с авторами.
+        for url in (reviews_url, comments_url):
+            with django_assert_num_queries(3):
+                response = client.get(f'{url}?page_size=100')
+            results = response.json()['results']
+            assert len(results) == len(author_map)
+            assert {item['author'] for item in results} == {
+                author.username for author in author_map
+            }
+
+        for url in (f'{reviews_url}{reviews[1]["id"]}/',
+                    f'{comments_url}{comments[1]["id"]}/'):
+            with django_assert_num_queries(1):
+                response = client.get(url)
+            assert response.json()['author'] == user.username
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08ClaimsAuthentication:
+
+    def get_client(self, user):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {get_access_token(user)}'
+        )
+        return client
+
+    def test_01_no_auth_queries(self, admin_client, user,
+                                django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(admin_client, titles[0]['id'], 'Отзыв', 5)
+        get_user_cache().clear()
+        client = self.get_client(user)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        # Произведение, COUNT(*) и страница - без запроса пользователя.
+        with django_assert_num_queries(3):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+
+    def test_02_user_changes_invalidate_claims(self, user):
+        client = self.get_client(user)
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        user.role = 'admin'
+        user.save()
+        assert client.get('/api/v1/users/').status_code == HTTPStatus.OK
+
+        response = client.get('/api/v1/users/me/')
+        assert response.json()['email'] == user.email
+        user.delete()
+        assert client.get('/api/v1/users/me/').status_code == (
+            HTTPStatus.UNAUTHORIZED
+        )
+
+    def test_03_demotion_survives_full_user_cache(self, admin):
+        client = self.get_client(admin)
+        assert client.get('/api/v1/users/').status_code == HTTPStatus.OK
+        stale = get_user_cache().get(USER_KEY.format(user_id=admin.pk))
+        admin.role = 'user'
+        admin.save()
+        # Кэш пользователей переполнен: LRU вытесняет все записи.
+        cache = get_user_cache()
+        for idx in range(cache._max_entries + 1):
+            cache.set(f'filler:{idx}', idx)
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        ), 'Старый токен разжалованного админа не должен давать его права.'
+        # Воркер, в кэше которого осталась запись до изменения.
+        cache.set(USER_KEY.format(user_id=admin.pk), stale)
+        assert client.get('/api/v1/users/').status_code == (
+            HTTPStatus.FORBIDDEN
+        ), 'Запись кэша старше изменения пользователя не используется.'
+
+    def test_04_revocation_markers(self, django_user_model):
+        user = django_user_model.objects.create(
+            username='fresh', email='fresh@yamdb.fake'
+        )
+        assert get_changed(user.pk) is None, (
+            'Создание пользователя не должно оставлять отметку изменения.'
+        )
+        user.role = 'moderator'
+        user.save()
+        assert get_changed(user.pk) is not None
+
+
+def test_08_revocation_store_purges_expired(tmp_path):
+    store = SQLiteRevocationStore(tmp_path / 'revocations.sqlite3')
+    store.set(1, 100.0, 200.0)
+    assert store.get(1, 150.0) == 100.0
+    assert store.get(1, 200.0) is None, 'Истекшая отметка не действует.'
+    for user_id in range(2, store.PURGE_EVERY + 1):
+        store.set(user_id, 300.0, 400.0)
+    rows = store.get_connection().execute(
+        'SELECT COUNT(*) FROM revocation'
+    ).fetchone()[0]
+    assert rows == store.PURGE_EVERY - 1, (
+        'Истекшие отметки должны периодически удаляться.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08SignupQueries:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_signup_single_lookup(self, client, settings,
+                                     django_assert_max_num_queries):
+        # Считаем запросы самой регистрации, без отправки письма.
+        settings.MAIL_OUTBOX_EAGER = False
+        data = {'username': 'new_user', 'email': 'new_user@yamdb.fake'}
+        # Поиск, BEGIN, вставка пользователя в точке сохранения (3 запроса),
+        # письмо в очередь и COMMIT.
+        with django_assert_max_num_queries(7):
+            response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.OK
+        # Повторный запрос кода: поиск, BEGIN, UPDATE кода, письмо в очередь
+        # и COMMIT.
+        with django_assert_max_num_queries(5):
+            response = client.post(self.URL_SIGNUP, data=data)
+        assert response.status_code == HTTPStatus.OK
+
+        response = client.post(self.URL_SIGNUP, data={
+            'username': 'new_user', 'email': 'other@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert set(response.json()) == {'username'}
+
+    def test_02_signup_race_updates_existing_user(self, django_user_model):
+        data = {'username': 'racer', 'email': 'racer@yamdb.fake'}
+        serializer = SignupSerializer(data=data)
+        assert serializer.is_valid()
+        # Параллельный запрос создал пользователя после проверки.
+        django_user_model.objects.create(**data)
+        user = serializer.save()
+        assert django_user_model.objects.get(
+            username='racer'
+        ).confirmation_code == user.confirmation_code
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08SparseFieldsets:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_title_fields_prune_sql(self, client, admin_client,
+                                       django_assert_num_queries):
+        create_titles(admin_client)
+        # COUNT(*) и страница: без JOIN категорий и запроса жанров.
+        with django_assert_num_queries(2) as context:
+            response = client.get(self.TITLES_URL, {'fields': 'id,name'})
+        assert response.status_code == HTTPStatus.OK
+        assert all(set(title) == {'id', 'name'}
+                   for title in response.json()['results'])
+        page_sql = context.captured_queries[-1]['sql']
+        assert 'reviews_category' not in page_sql
+        assert 'description' not in page_sql
+        assert 'rating_sum' not in page_sql
+
+        response = client.get(self.TITLES_URL,
+                              {'exclude': 'description,genre'})
+        assert set(response.json()['results'][0]) == {
+            'id', 'name', 'year', 'category', 'rating'
+        }
+        response = client.get(self.TITLES_URL, {'fields': 'id,unknown'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_review_fields_prune_sql(self, admin_client, user_client,
+                                        django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+        user_client.post(url, data={'text': 'Текст', 'score': 5})
+        with django_assert_num_queries(3) as context:
+            response = user_client.get(url, {'exclude': 'text,author'})
+        assert set(response.json()['results'][0]) == {
+            'id', 'score', 'pub_date'
+        }
+        # Сортировка по автору оставляет JOIN, но поля автора не читаются.
+        page_sql = context.captured_queries[-1]['sql']
+        assert '"reviews_user"."username"' not in page_sql
+        assert '"text"' not in page_sql
+
+        response = admin_client.get('/api/v1/users/',
+                                    {'fields': 'username'})
+        assert all(set(user) == {'username'}
+                   for user in response.json()['results'])
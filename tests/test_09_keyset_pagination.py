@@ -0,0 +1,96 @@
+import base64
+import json
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews, create_titles
+
+
+def collect_pages(client, url):
+    results = []
+    pages = 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data
+        results.extend(data['results'])
+        url = data['next']
+        pages += 1
+    return results, pages
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09KeysetPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    USERS_URL = '/api/v1/users/'
+
+    def test_01_titles_cursor(self, client, admin_client):
+        create_titles(admin_client)
+        for idx in range(5):
+            admin_client.post(self.TITLES_URL, data={
+                'name': f'Произведение {idx}', 'year': 2000,
+                'genre': ['drama'], 'category': 'films'
+            })
+        expected = client.get(f'{self.TITLES_URL}?page_size=100').json()
+
+        results, pages = collect_pages(
+            client, f'{self.TITLES_URL}?cursor=&page_size=2'
+        )
+        assert results == expected['results']
+        assert pages == 4
+
+    def test_02_users_cursor_back_and_forth(self, admin_client,
+                                            django_user_model):
+        for idx in range(4):
+            django_user_model.objects.create_user(
+                username=f'user{idx}', email=f'user{idx}@yamdb.fake',
+                role=('moderator', 'user')[idx % 2]
+            )
+        expected = [
+            user['username'] for user in
+            admin_client.get(f'{self.USERS_URL}?limit=100').json()['results']
+        ]
+        results, _ = collect_pages(
+            admin_client, f'{self.USERS_URL}?cursor=&page_size=2'
+        )
+        assert [user['username'] for user in results] == expected
+
+        first = admin_client.get(f'{self.USERS_URL}?cursor=&page_size=2')
+        assert first.json()['previous'] is None
+        second = admin_client.get(first.json()['next']).json()
+        back = admin_client.get(second['previous']).json()
+        assert back['results'] == first.json()['results']
+
+    def test_03_invalid_cursor(self, client, admin_client, admin, user,
+                               moderator, moderator_client, user_client):
+        response = client.get(f'{self.TITLES_URL}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        authors_map = {admin: admin_client, moderator: moderator_client,
+                       user: user_client}
+        _, titles = create_reviews(admin_client, authors_map)
+        reviews_url = f'{self.TITLES_URL}{titles[0]["id"]}/reviews/'
+        cases = (
+            (self.TITLES_URL, [{'a': 1}]),
+            (self.TITLES_URL, ['x']),
+            (self.TITLES_URL, [None]),
+            (self.TITLES_URL, [True]),
+            (self.TITLES_URL, [1, 2]),
+            (f'{self.TITLES_URL}?q=орешек&', ['x', 1]),
+            (reviews_url, ['garbage', 1, 1]),
+            (reviews_url, [None, 1, 1]),
+            (reviews_url, ['2024-01-01T00:00:00', 'x', 1]),
+            ('/api/v1/users/', [None, 1]),
+            ('/api/v1/users/', ['user', 'x']),
+        )
+        for url, position in cases:
+            payload = json.dumps({'p': position, 'r': 0}).encode()
+            cursor = base64.urlsafe_b64encode(payload).decode()
+            separator = '' if url.endswith('&') else '?'
+            response = admin_client.get(f'{url}{separator}cursor={cursor}')
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                f'Курсор с позицией {position} для `{url}` некорректен: '
+                'должен возвращаться ответ со статусом 404.'
+            )
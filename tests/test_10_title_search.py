@@ -0,0 +1,88 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Title
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, query):
+        response = client.get(self.TITLES_URL, {'q': query})
+        assert response.status_code == HTTPStatus.OK
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_full_text_search(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.search(client, 'ОРЕШ') == ['Крепкий орешек']
+        assert self.search(client, 'back') == ['Терминатор']
+        assert self.search(client, '"*') == []
+        response = client.get(self.TITLES_URL, {'search': 'back'})
+        assert response.json()['count'] == 0, (
+            'Параметр `search` должен искать только по названию.'
+        )
+
+    def test_02_ranked_by_relevance(self, client, admin_client):
+        create_titles(admin_client)
+        for name, description in (('Побег', 'Побег из тюрьмы, побег'),
+                                  ('Тюрьма', 'Побег')):
+            admin_client.post(self.TITLES_URL, data={
+                'name': name, 'description': description, 'year': 1994,
+                'genre': ['drama'], 'category': 'films'
+            })
+        assert self.search(client, 'побег') == ['Побег', 'Тюрьма']
+
+    def test_03_index_follows_writes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        Title.objects.filter(pk=titles[0]['id']).update(name='Чужой')
+        assert self.search(client, 'чужой') == ['Чужой']
+        assert self.search(client, 'терминатор') == []
+
+        admin_client.delete(f'{self.TITLES_URL}{titles[0]["id"]}/')
+        assert self.search(client, 'чужой') == []
+
+    def test_04_normalized_name_prefix(self, client, admin_client):
+        create_titles(admin_client)
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Ёжик  в   ТУМАНЕ', 'year': 1975,
+            'genre': ['drama'], 'category': 'films'
+        })
+        for query in ('крепкий', 'КРЕП', 'ежик в т', 'ЁЖИК В ТУМАНЕ'):
+            response = client.get(self.TITLES_URL, {'name': query})
+            assert response.json()['count'] == 1, (
+                'Фильтр `name` должен искать по началу названия без учета '
+                f'регистра и буквы ё. Запрос: `{query}`.'
+            )
+        response = client.get(self.TITLES_URL, {'name': 'орешек'})
+        assert response.json()['count'] == 0
+
+        response = client.get('/api/v1/genres/', {'search': 'ДРА'})
+        assert [genre['slug'] for genre in response.json()['results']] == [
+            'drama'
+        ]
+        assert 'name_search' not in response.json()['results'][0]
+
+    def test_05_genre_and_category_slugs(self, client, admin_client):
+        create_titles(admin_client)
+
+        def names(params):
+            response = client.get(self.TITLES_URL, params)
+            assert response.status_code == HTTPStatus.OK
+            return sorted(t['name'] for t in response.json()['results'])
+
+        both = ['Крепкий орешек', 'Терминатор']
+        assert names({'genre': 'horr'}) == []
+        assert names({'genre': 'horror,comedy'}) == ['Терминатор']
+        assert names({'genre': 'horror,drama'}) == both
+        assert names({'genre': 'horror,drama', 'genre_match': 'all'}) == []
+        assert names(
+            {'genre': 'horror,comedy', 'genre_match': 'all'}
+        ) == ['Терминатор']
+        assert names({'genre__icontains': 'o'}) == ['Терминатор']
+        assert names({'category': 'film'}) == []
+        assert names({'category': 'films,books'}) == both
+        assert names({'category__icontains': 'film'}) == ['Терминатор']
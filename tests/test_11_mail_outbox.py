@@ -0,0 +1,113 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews.models import OutgoingEmail
+from reviews.outbox import claim
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11MailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def signup(self, client):
+        response = client.post(self.URL_SIGNUP, data={
+            'username': 'outbox_user', 'email': 'outbox@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+
+    def test_01_worker_delivers_queued_mail(self, client, settings):
+        settings.MAIL_OUTBOX_EAGER = False
+        self.signup(client)
+        assert len(mail.outbox) == 0, (
+            'Без `MAIL_OUTBOX_EAGER` письмо не должно отправляться '
+            'в запросе регистрации.'
+        )
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.Status.PENDING
+
+        call_command('run_mail_worker', '--once')
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == ['outbox@yamdb.fake']
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.Status.SENT
+        assert email.attempts == 1
+
+        call_command('run_mail_worker', '--once')
+        assert len(mail.outbox) == 1, (
+            'Отправленное письмо не должно уходить повторно.'
+        )
+
+    def test_02_failed_mail_is_retried_with_backoff(
+            self, client, settings, monkeypatch):
+        settings.MAIL_OUTBOX_EAGER = False
+        self.signup(client)
+
+        def fail(self):
+            raise ConnectionError('SMTP недоступен')
+
+        monkeypatch.setattr('django.core.mail.EmailMessage.send', fail)
+        call_command('run_mail_worker', '--once', '--max-attempts', '2')
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.Status.PENDING
+        assert email.attempts == 1
+        assert 'SMTP' in email.last_error
+
+        call_command('run_mail_worker', '--once', '--max-attempts', '2')
+        email.refresh_from_db()
+        assert email.attempts == 1, (
+            'Письмо после ошибки должно ждать окончания задержки.'
+        )
+
+        OutgoingEmail.objects.update(send_after=email.created_at)
+        call_command('run_mail_worker', '--once', '--max-attempts', '2')
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.Status.FAILED
+        assert email.attempts == 2
+
+    def test_03_eager_delivery_claims_mail(self, client):
+        self.signup(client)
+        assert len(mail.outbox) == 1
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.Status.SENT
+        assert email.attempts == 1
+        assert not claim(email), (
+            'Отправленное письмо не должно закрепляться повторно.'
+        )
+
+        call_command('run_mail_worker', '--once')
+        assert len(mail.outbox) == 1, (
+            'Воркер не должен повторно отправлять письмо, '
+            'отправленное сразу после фиксации.'
+        )
+
+    def test_04_eager_connection_error_keeps_signup(
+            self, client, monkeypatch):
+
+        class BrokenConnection:
+            def open(self):
+                raise ConnectionRefusedError('SMTP недоступен')
+
+            def close(self):
+                pass
+
+        monkeypatch.setattr('reviews.outbox.get_connection', BrokenConnection)
+        self.signup(client)
+        assert len(mail.outbox) == 0
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.Status.PENDING
+        assert email.attempts == 1
+        assert 'SMTP' in email.last_error
+        assert email.send_after > timezone.now(), (
+            'Письмо после ошибки отправки должно вернуться в очередь '
+            'с задержкой.'
+        )
+
+        monkeypatch.undo()
+        OutgoingEmail.objects.update(send_after=email.created_at)
+        call_command('run_mail_worker', '--once')
+        assert len(mail.outbox) == 1
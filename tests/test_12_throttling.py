@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+import pytest
+
+from api.throttling import SQLiteBucketStore
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12AuthThrottling:
+
+    URL_TOKEN = '/api/v1/auth/token/'
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def test_01_username_bucket(self, client, user,
+                                django_assert_num_queries):
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        for _ in range(10):
+            response = client.post(self.URL_TOKEN, data=data,
+                                   REMOTE_ADDR='10.0.0.1')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        # Другой IP не помогает: корзина общая для имени пользователя.
+        with django_assert_num_queries(0):
+            response = client.post(self.URL_TOKEN, data=data,
+                                   REMOTE_ADDR='10.0.0.2')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'После исчерпания лимита попыток для имени пользователя '
+            'должен возвращаться ответ со статусом 429.'
+        )
+        assert int(response['Retry-After']) > 0
+
+    def test_02_ip_bucket(self, client, django_assert_num_queries):
+        for idx in range(30):
+            client.post(self.URL_SIGNUP, data={'username': f'user_{idx}'})
+        with django_assert_num_queries(0):
+            response = client.post(self.URL_SIGNUP,
+                                   data={'username': 'user_last'})
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+    def test_03_spoofed_forwarded_for(self, client):
+        statuses = [
+            client.post(self.URL_SIGNUP, data={'username': f'user_{idx}'},
+                        HTTP_X_FORWARDED_FOR=f'203.0.113.{idx}').status_code
+            for idx in range(40)
+        ]
+        assert statuses.count(HTTPStatus.TOO_MANY_REQUESTS) == 10, (
+            'Подмена X-Forwarded-For не должна обходить лимит для IP.'
+        )
+
+    def test_04_non_object_body(self, client):
+        for url in (self.URL_SIGNUP, self.URL_TOKEN):
+            for body in ([1, 2], 'username'):
+                response = client.post(url, data=body,
+                                       content_type='application/json')
+                assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                    f'POST-запрос к `{url}` с телом-не объектом должен '
+                    'возвращать ответ со статусом 400.'
+                )
+
+
+def test_12_sqlite_store_is_shared(tmp_path):
+    path = tmp_path / 'throttle.sqlite3'
+    first, second = SQLiteBucketStore(path), SQLiteBucketStore(path)
+    assert first.consume('key', 100.0, 2, 1) == 0
+    assert second.consume('key', 100.0, 2, 1) == 0
+    assert first.consume('key', 100.0, 2, 1) == pytest.approx(1), (
+        'Хранилища с одним файлом должны расходовать общую корзину.'
+    )
+    assert second.consume('key', 101.0, 2, 1) == 0
@@ -0,0 +1,109 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+
+from api import batch
+from reviews.models import Review, Title
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13Batch:
+
+    REVIEWS_URL = '/api/v1/batch/reviews/'
+    COMMENTS_URL = '/api/v1/batch/comments/'
+
+    def test_01_batch_reviews(self, admin_client, user_client,
+                              django_assert_max_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        response = user_client.post(self.REVIEWS_URL, data=[
+            {'title': first, 'text': 'Первый', 'score': 10},
+            {'title': second, 'text': 'Второй', 'score': 4},
+            {'title': first, 'text': 'Повтор', 'score': 1},
+            {'title': 0, 'text': 'Нет произведения', 'score': 5},
+            {'title': second, 'text': 'Плохая оценка', 'score': 11},
+        ], format='json')
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            201, 201, 400, 400, 400
+        ], 'Результаты должны идти в порядке элементов запроса.'
+        assert results[0]['data']['title'] == first
+        assert results[0]['data']['id'] is not None
+        assert 'score' in results[4]['errors']
+
+        response = admin_client.get(f'/api/v1/titles/{first}/')
+        assert response.json()['rating'] == 10
+        response = admin_client.get(f'/api/v1/titles/{second}/reviews/')
+        assert response.json()['results'][0]['id'] == results[1]['data']['id']
+
+        with django_assert_max_num_queries(3):
+            response = user_client.post(self.REVIEWS_URL, data=[
+                {'title': first, 'text': 'Еще раз', 'score': 3},
+                {'title': second, 'text': 'И еще', 'score': 3},
+            ], format='json')
+        assert [result['status'] for result in response.json()] == [
+            400, 400
+        ], 'Повторный отзыв автора на произведение должен отклоняться.'
+
+    def test_02_batch_comments(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        response = user_client.post(self.REVIEWS_URL, data=[
+            {'title': titles[0]['id'], 'text': 'Отзыв', 'score': 7},
+        ], format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        review_id = response.json()[0]['data']['id']
+
+        response = user_client.post(self.COMMENTS_URL, data=[
+            {'review': review_id, 'text': f'Комментарий {idx}'}
+            for idx in range(3)
+        ], format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        ids = [result['data']['id'] for result in response.json()]
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/{review_id}/'
+               f'comments/')
+        comments = user_client.get(url).json()['results']
+        assert [(comment['id'], comment['text']) for comment in comments] == [
+            (pk, f'Комментарий {idx}') for idx, pk in enumerate(ids)
+        ]
+
+    def test_03_batch_requires_auth_and_list(self, user_client):
+        response = APIClient().post(self.COMMENTS_URL, data=[],
+                                    format='json')
+        assert response.status_code == HTTPStatus.UNAUTHORIZED
+        response = user_client.post(self.COMMENTS_URL, data={'text': 'x'},
+                                    format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_concurrent_review_conflict(self, admin_client, user_client,
+                                           monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        check_reviews = batch.check_reviews
+
+        def check_before_race(author, pending, results):
+            accepted = check_reviews(author, pending, results)
+            # Параллельный запрос создал отзыв после проверки пакета.
+            if not Review.objects.filter(author=author,
+                                         title_id=first).exists():
+                Review.objects.create(author=author, title_id=first,
+                                      text='Параллельный', score=2)
+            return accepted
+
+        monkeypatch.setattr(batch, 'check_reviews', check_before_race)
+        response = user_client.post(self.REVIEWS_URL, data=[
+            {'title': first, 'text': 'Первый', 'score': 10},
+            {'title': second, 'text': 'Второй', 'score': 4},
+        ], format='json')
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        results = response.json()
+        assert [result['status'] for result in results] == [400, 201], (
+            'При конфликте с параллельным запросом пакет должен вернуть '
+            'результат для каждого элемента.'
+        )
+        assert 'non_field_errors' in results[0]['errors']
+        assert results[1]['data']['title'] == second
+        assert Title.objects.get(pk=first).rating_count == 1
+        assert Title.objects.get(pk=second).rating_count == 1
@@ -0,0 +1,53 @@
+import pytest
+
+from api.views import CommentsViewSet, ReviewViewSet, TitleViewSet
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14FastRead:
+
+    def assert_parity(self, client, monkeypatch, view, url, params):
+        fast = client.get(url, params)
+        assert fast.status_code == 200
+        with monkeypatch.context() as patch:
+            patch.setattr(view, 'fast_representation', None)
+            slow = client.get(url, params)
+        assert fast.content == slow.content, (
+            f'Быстрый list `{url}` с параметрами {params} должен отдавать '
+            'тот же ответ, что и сериализатор.'
+        )
+        return fast.json()
+
+    def test_01_list_parity(self, admin_client, admin, moderator, user,
+                            moderator_client, user_client, monkeypatch):
+        authors_map = {admin: admin_client, moderator: moderator_client,
+                       user: user_client}
+        _, reviews, titles = create_comments(admin_client, authors_map)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Новинка', 'year': 2000, 'genre': ['drama'],
+            'category': 'films'
+        })
+        titles_url = '/api/v1/titles/'
+        reviews_url = f'{titles_url}{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        cases = (
+            (TitleViewSet, titles_url, {}),
+            (TitleViewSet, titles_url, {'page_size': 1, 'cursor': ''}),
+            (TitleViewSet, titles_url, {'q': 'орешек'}),
+            (TitleViewSet, titles_url, {'genre': 'drama',
+                                        'exclude': 'description'}),
+            (TitleViewSet, titles_url, {'fields': 'rating,genre,id'}),
+            (ReviewViewSet, reviews_url, {}),
+            (ReviewViewSet, reviews_url, {'page_size': 2, 'cursor': ''}),
+            (ReviewViewSet, reviews_url, {'fields': 'author,pub_date'}),
+            (CommentsViewSet, comments_url, {}),
+            (CommentsViewSet, comments_url, {'exclude': 'text'}),
+        )
+        for view, url, params in cases:
+            data = self.assert_parity(admin_client, monkeypatch, view, url,
+                                      params)
+            assert data['results']
+            if data.get('next') and 'cursor' in params:
+                self.assert_parity(admin_client, monkeypatch, view,
+                                   data['next'], {})
@@ -0,0 +1,89 @@
+import datetime
+import decimal
+import io
+import json
+import uuid
+
+import pytest
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from tests.utils import create_comments
+
+PAYLOADS = (
+    {'count': 2, 'results': [{'id': 1, 'name': 'Кино', 'rating': 7.5,
+                              'genre': [], 'category': None}]},
+    ReturnDict({'text': 'строка\u2028абзац\u2029'}, serializer=None),
+    {'floats': [0.1, 123456789.125, -0.0, 7 / 3, 1e15, 0.0001]},
+    {'big': 2 ** 70, 'keys': {1: 'a', 2.5: 'b', False: 'c', None: 'd'}},
+    {'date': datetime.datetime(2024, 5, 1, 10, 30, 15, 123456,
+                               tzinfo=datetime.timezone.utc),
+     'day': datetime.date(2024, 5, 1), 'time': datetime.time(10, 30),
+     'delta': datetime.timedelta(hours=1), 'uuid': uuid.uuid4(),
+     'decimal': decimal.Decimal('1.10'), 'lazy': gettext_lazy('Имя'),
+     'tuple': (1, 2), 'set': {3}},
+    [],
+    'строка',
+)
+
+
+def render(renderer_class, data, media_type=None, context=None):
+    return renderer_class().render(data, media_type, context)
+
+
+@pytest.mark.parametrize('data', PAYLOADS)
+def test_15_renderer_byte_identical(data):
+    assert render(FastJSONRenderer, data) == render(JSONRenderer, data), (
+        'FastJSONRenderer должен отдавать те же байты, что и JSONRenderer.'
+    )
+    assert (render(FastJSONRenderer, data, 'application/json; indent=4')
+            == render(JSONRenderer, data, 'application/json; indent=4'))
+
+
+@pytest.mark.parametrize('data', PAYLOADS)
+def test_15_renderer_without_orjson(data, settings):
+    settings.API_JSON_BACKEND = 'json'
+    assert render(FastJSONRenderer, data) == render(JSONRenderer, data)
+
+
+def test_15_renderer_exponent_floats_equal():
+    data = {'floats': [1e16, 1e-05, 2.0 ** 70]}
+    assert (json.loads(render(FastJSONRenderer, data))
+            == json.loads(render(JSONRenderer, data)))
+
+
+@pytest.mark.parametrize('content', (
+    b'{"username": "\xd0\xb8\xd0\xbc\xd1\x8f", "items": [1, 2.5, null]}',
+    b'{"a": 1', b'{"a": NaN}', b'[1, 2] x',
+), ids=('valid', 'truncated', 'nan', 'trailing'))
+def test_15_parser_matches_json_parser(content):
+    results = []
+    for parser_class in (FastJSONParser, JSONParser):
+        try:
+            results.append(parser_class().parse(io.BytesIO(content)))
+        except ParseError as error:
+            results.append(str(error.detail))
+    assert results[0] == results[1], (
+        'FastJSONParser должен разбирать тело и сообщать об ошибках '
+        'так же, как JSONParser.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_15_api_responses_byte_identical(admin_client, admin, moderator,
+                                         user, moderator_client,
+                                         user_client):
+    authors_map = {admin: admin_client, moderator: moderator_client,
+                   user: user_client}
+    _, reviews, titles = create_comments(admin_client, authors_map)
+    reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+    for url in ('/api/v1/titles/', f'/api/v1/titles/{titles[0]["id"]}/',
+                reviews_url, f'{reviews_url}{reviews[0]["id"]}/comments/',
+                '/api/v1/users/', '/api/v1/genres/'):
+        response = admin_client.get(url)
+        assert response.content == render(JSONRenderer, response.data)
@@ -0,0 +1,66 @@
+import pytest
+from rest_framework.utils.urls import replace_query_param
+
+from api.mixins import FastListMixin
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Streaming:
+
+    def assert_parity(self, client, monkeypatch, url, params):
+        # Ссылки пагинатора уже содержат параметры запроса.
+        for key, value in {**params, 'stream': 1}.items():
+            url = replace_query_param(url, key, value)
+        stream = client.get(url)
+        assert stream.status_code == 200
+        assert stream.streaming, (
+            f'Запрос `{url}` с параметром stream должен отдаваться потоком.'
+        )
+        content = b''.join(stream.streaming_content)
+        with monkeypatch.context() as patch:
+            patch.setattr(FastListMixin, 'can_stream', lambda view: False)
+            plain = client.get(url)
+        assert not plain.streaming
+        assert content == plain.content, (
+            f'Поток `{url}` с параметрами {params} должен совпадать '
+            'с обычным ответом.'
+        )
+        return plain.json()
+
+    def test_01_stream_parity(self, admin_client, admin, moderator, user,
+                              moderator_client, user_client, monkeypatch):
+        authors_map = {admin: admin_client, moderator: moderator_client,
+                       user: user_client}
+        _, reviews, titles = create_comments(admin_client, authors_map)
+        titles_url = '/api/v1/titles/'
+        reviews_url = f'{titles_url}{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{reviews[0]["id"]}/comments/'
+        cases = (
+            (titles_url, {}),
+            (titles_url, {'fields': 'id,genre,rating'}),
+            (reviews_url, {'page_size': 1, 'cursor': ''}),
+            (comments_url, {'exclude': 'text'}),
+        )
+        for url, params in cases:
+            data = self.assert_parity(admin_client, monkeypatch, url, params)
+            assert data['results']
+            if 'cursor' not in params:
+                continue
+            assert data['next']
+            data = self.assert_parity(admin_client, monkeypatch,
+                                      data['next'], {})
+            assert data['previous']
+            self.assert_parity(admin_client, monkeypatch, data['previous'],
+                               {})
+
+    def test_02_stream_empty_page(self, admin_client, monkeypatch):
+        data = self.assert_parity(admin_client, monkeypatch,
+                                  '/api/v1/titles/', {'name': 'нет такого'})
+        assert data['results'] == []
+
+    def test_03_stream_is_opt_in(self, admin_client):
+        response = admin_client.get('/api/v1/titles/')
+        assert not response.streaming, (
+            'Без параметра stream список отдается обычным ответом.'
+        )
@@ -0,0 +1,77 @@
+import threading
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS
+from django.db.utils import ConnectionHandler
+
+from reviews.management.commands.benchmark_sqlite import (SCHEMA_SQL,
+                                                          post_review)
+
+
+def get_connection(tmp_path, **options):
+    handler = ConnectionHandler({DEFAULT_DB_ALIAS: {
+        'ENGINE': 'api_yamdb.sqlite',
+        'NAME': tmp_path / 'test.sqlite3',
+        'OPTIONS': options,
+    }})
+    return handler, handler[DEFAULT_DB_ALIAS]
+
+
+@pytest.fixture(autouse=True)
+def unblock_db(django_db_blocker):
+    # Тесты работают со своим файлом БД, а не с тестовой базой проекта.
+    with django_db_blocker.unblock():
+        yield
+
+
+class Test17SQLiteBackend:
+
+    def test_01_pragmas(self, tmp_path):
+        _, connection = get_connection(
+            tmp_path, pragmas={'busy_timeout': 1234}
+        )
+        with connection.cursor() as cursor:
+            for pragma, expected in (('journal_mode', 'wal'),
+                                     ('synchronous', 1),
+                                     ('busy_timeout', 1234),
+                                     ('foreign_keys', 1)):
+                cursor.execute(f'PRAGMA {pragma}')
+                assert cursor.fetchone()[0] == expected, (
+                    f'Соединение должно открываться с PRAGMA {pragma} = '
+                    f'{expected}.'
+                )
+        connection.close()
+
+    def test_02_concurrent_writers(self, tmp_path):
+        handler, connection = get_connection(tmp_path)
+        with connection.cursor() as cursor:
+            for sql in SCHEMA_SQL:
+                cursor.execute(sql)
+            cursor.execute('INSERT INTO title VALUES (1, 0, 0)')
+        connection.close()
+        errors = []
+
+        def writer(index):
+            connection = handler[DEFAULT_DB_ALIAS]
+            try:
+                for number in range(20):
+                    post_review(connection, index * 20 + number, 1, 5)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=writer, args=(index,))
+                   for index in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not errors, (
+            'Транзакции, которые читают и затем пишут, должны ждать '
+            'блокировку записи, а не падать с "database is locked".'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT rating_sum, rating_count FROM title')
+            assert cursor.fetchone() == (600, 120)
+        connection.close()
@@ -0,0 +1,114 @@
+import pytest
+from django.db import DEFAULT_DB_ALIAS, router
+from django.test import override_settings
+
+from api.cache import MODIFIED_KEY, get_cache
+from api_yamdb.routers import RoutingState
+from reviews.models import Title
+
+LABELS = ('reviews.category', 'reviews.genre', 'reviews.title',
+          'reviews.review', 'reviews.comment')
+REPLICAS = {'ALIASES': ['replica'], 'MAX_LAG': 60, 'CACHE': 'default'}
+
+
+def make_stale(*labels):
+    """Изменения моделей - давно: реплики их уже получили."""
+    cache = get_cache()
+    for label in labels or LABELS:
+        cache.set(MODIFIED_KEY.format(label=label), 0, None)
+
+
+@pytest.fixture
+def replica_reads(monkeypatch):
+    """Запросы к реплике выполняются на `default`, но записываются."""
+    reads = []
+
+    def replica(state):
+        reads.append(state.request.path)
+        return DEFAULT_DB_ALIAS
+
+    monkeypatch.setattr(RoutingState, 'replica', property(replica))
+    make_stale()
+    with override_settings(DATABASE_REPLICAS=REPLICAS):
+        yield reads
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ReplicaRouter:
+
+    def test_01_outside_request(self, replica_reads):
+        assert router.db_for_read(Title) == DEFAULT_DB_ALIAS, (
+            'Вне HTTP-запроса чтение должно идти с основной БД.'
+        )
+
+    def test_02_safe_reads(self, client, replica_reads):
+        response = client.get('/api/v1/categories/')
+        assert response.status_code == 200
+        assert replica_reads, (
+            'GET-запрос к списку должен читать с реплики.'
+        )
+
+    def test_03_writes_use_primary(self, admin_client, replica_reads):
+        response = admin_client.post(
+            '/api/v1/categories/', data={'name': 'Книги', 'slug': 'books'}
+        )
+        assert response.status_code == 201
+        assert not replica_reads, (
+            'Запрос с записью должен целиком идти на основную БД.'
+        )
+
+    def test_04_read_your_writes(self, user_client, admin_client,
+                                 replica_reads):
+        response = user_client.patch('/api/v1/users/me/',
+                                     data={'bio': 'новое'})
+        assert response.status_code == 200
+        response = user_client.get('/api/v1/users/me/')
+        assert response.json()['bio'] == 'новое'
+        assert not replica_reads, (
+            'После записи пользователь должен читать с основной БД.'
+        )
+        admin_client.get('/api/v1/users/me/')
+        assert replica_reads, (
+            'Запись одного пользователя не должна переключать '
+            'на основную БД остальных.'
+        )
+
+    def test_05_recent_changes_use_primary(self, admin_client, client,
+                                           replica_reads):
+        admin_client.post('/api/v1/categories/',
+                          data={'name': 'Книги', 'slug': 'books'})
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Мост', 'year': 2000, 'category': 'books'
+        })
+        response = client.get('/api/v1/titles/')
+        assert response.status_code == 200
+        assert not replica_reads, (
+            'Сразу после изменения модели список должен читаться '
+            'с основной БД: реплика может отставать.'
+        )
+        make_stale()
+        # Другие параметры: ответ не из кэша ответов.
+        client.get('/api/v1/titles/', {'year': 2000})
+        assert replica_reads, (
+            'Спустя MAX_LAG список снова должен читаться с реплики.'
+        )
+
+    def test_06_stream_reads_replica(self, admin_client, client,
+                                     replica_reads):
+        admin_client.post('/api/v1/categories/',
+                          data={'name': 'Книги', 'slug': 'books'})
+        for idx in range(3):
+            admin_client.post('/api/v1/titles/', data={
+                'name': f'Мост {idx}', 'year': 2000, 'category': 'books'
+            })
+        make_stale()
+        response = client.get('/api/v1/titles/', {'stream': 1})
+        assert response.streaming
+        envelope_reads = len(replica_reads)
+        assert envelope_reads, 'COUNT(*) и ссылки - с реплики.'
+        content = b''.join(response.streaming_content)
+        assert 'Мост 2' in content.decode()
+        assert len(replica_reads) > envelope_reads, (
+            'Строки потоковой страницы должны читаться с той же реплики, '
+            'что и конверт ответа.'
+        )
@@ -0,0 +1,81 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+MAIN_TABLE_RE = re.compile(r'^SELECT .*? FROM "(\w+)"')
+
+
+def get_plans(client, url, params, table):
+    """Планы SELECT-запросов эндпоинта к его основной таблице."""
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url, params)
+    assert response.status_code == 200
+    plans = []
+    for query in context.captured_queries:
+        match = MAIN_TABLE_RE.match(query['sql'])
+        if match is None or match.group(1) != table:
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + query['sql'])
+            plans.append((query['sql'],
+                          [row[-1] for row in cursor.fetchall()]))
+    assert plans, f'Не найден запрос `{url}` к таблице {table}.'
+    return plans
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19QueryPlans:
+    """Основные запросы списков идут по индексам.
+
+    Отобранные списки не читают таблицу целиком (SCAN), и ни один
+    запрос не сортирует строки во временном B-дереве. Без проверки
+    остаются поиск `?search=` / `?q=` и префикс названия: порядок
+    по релевантности или id не может совпасть с индексом поиска.
+    """
+
+    def test_01_list_plans(self, admin_client, admin, moderator, user,
+                           moderator_client, user_client):
+        if connection.vendor != 'sqlite':
+            pytest.skip('EXPLAIN QUERY PLAN есть только в SQLite.')
+        authors_map = {admin: admin_client, moderator: moderator_client,
+                       user: user_client}
+        _, reviews, titles = create_comments(admin_client, authors_map)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{review_id}/comments/'
+        # (url, параметры, таблица, есть ли отбор строк)
+        cases = (
+            ('/api/v1/users/', {}, 'reviews_user', False),
+            ('/api/v1/categories/', {}, 'reviews_category', False),
+            ('/api/v1/genres/', {}, 'reviews_genre', False),
+            ('/api/v1/titles/', {}, 'reviews_title', False),
+            ('/api/v1/titles/', {'cursor': ''}, 'reviews_title', False),
+            ('/api/v1/titles/', {'year': 1994}, 'reviews_title', True),
+            ('/api/v1/titles/', {'year': 1994, 'cursor': ''},
+             'reviews_title', True),
+            ('/api/v1/titles/', {'category': 'films'}, 'reviews_title',
+             True),
+            ('/api/v1/titles/', {'genre': 'drama'}, 'reviews_title', True),
+            ('/api/v1/titles/', {'ids': f'{title_id}'}, 'reviews_title',
+             True),
+            (reviews_url, {}, 'reviews_review', True),
+            (reviews_url, {'cursor': ''}, 'reviews_review', True),
+            (comments_url, {}, 'reviews_comment', True),
+            (comments_url, {'cursor': ''}, 'reviews_comment', True),
+        )
+        for url, params, table, filtered in cases:
+            full_scan = re.compile(rf'^SCAN (TABLE )?{table}\b')
+            for sql, plan in get_plans(admin_client, url, params, table):
+                assert not any('TEMP B-TREE' in line for line in plan), (
+                    f'Запрос `{url}` с параметрами {params} сортирует '
+                    f'строки без индекса:\n{sql}\n{plan}'
+                )
+                if filtered:
+                    assert not any(map(full_scan.match, plan)), (
+                        f'Запрос `{url}` с параметрами {params} читает '
+                        f'таблицу {table} целиком:\n{sql}\n{plan}'
+                    )
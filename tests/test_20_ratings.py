@@ -0,0 +1,87 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title
+from tests.utils import create_single_review, create_titles
+
+
+def get_rating(title_id):
+    return (Title.objects.filter(pk=title_id)
+            .values_list('rating_sum', 'rating_count').get())
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Ratings:
+
+    def test_01_review_create_update_delete(self, admin_client, user_client,
+                                            moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        url = f'/api/v1/titles/{title_id}/reviews/'
+        review = create_single_review(user_client, title_id, 'Текст',
+                                      10).json()
+        create_single_review(moderator_client, title_id, 'Текст', 2)
+        assert get_rating(title_id) == (12, 2)
+        assert admin_client.get(
+            f'/api/v1/titles/{title_id}/'
+        ).json()['rating'] == 6
+
+        user_client.patch(f'{url}{review["id"]}/', data={'score': 4})
+        assert get_rating(title_id) == (6, 2), (
+            'Изменение оценки должно сдвигать сумму оценок произведения.'
+        )
+        user_client.patch(f'{url}{review["id"]}/', data={'text': 'Новый'})
+        assert get_rating(title_id) == (6, 2)
+
+        response = user_client.delete(f'{url}{review["id"]}/')
+        assert response.status_code == 204
+        assert get_rating(title_id) == (2, 1), (
+            'Удаление отзыва должно убирать его оценку из рейтинга.'
+        )
+
+    def test_02_user_delete_cascade(self, admin_client, user, user_client,
+                                    moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Текст', 10)
+        create_single_review(moderator_client, title_id, 'Текст', 2)
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        assert get_rating(title_id) == (2, 1), (
+            'Каскадное удаление отзывов пользователя должно пересчитывать '
+            'рейтинг произведения.'
+        )
+        response = admin_client.get(f'/api/v1/titles/{title_id}/')
+        assert response.json()['rating'] == 2
+
+    def test_03_model_save(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        create_single_review(user_client, first, 'Текст', 8)
+        # Правка как в админке: сохранение модели в обход вьюсета.
+        review = Review.objects.get()
+        review.score = 3
+        review.save()
+        assert get_rating(first) == (3, 1)
+        review.title_id = second
+        review.save()
+        assert get_rating(first) == (0, 0)
+        assert get_rating(second) == (3, 1), (
+            'Перенос отзыва должен переносить оценку между произведениями.'
+        )
+        Review(pk=review.pk, title_id=second, author_id=review.author_id,
+               pub_date=review.pub_date, text='Текст', score=5).save()
+        assert get_rating(second) == (5, 1)
+
+    def test_04_rebuild_ratings(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Текст', 7)
+        Title.objects.update(rating_sum=100, rating_count=50)
+        out = StringIO()
+        call_command('rebuild_ratings', stdout=out)
+        assert get_rating(title_id) == (7, 1)
+        assert get_rating(titles[1]['id']) == (0, 0)
+        assert 'Пересчитано произведений: 2' in out.getvalue()
@@ -0,0 +1,100 @@
+import csv
+from datetime import datetime, timezone
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Count, Sum
+
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.search import TITLE_FTS_MATCH_SQL, normalize_search_text
+
+DATA_DIR = Path(settings.BASE_DIR) / 'static' / 'data'
+FILES = (
+    ('users.csv', User),
+    ('category.csv', Category),
+    ('genre.csv', Genre),
+    ('titles.csv', Title),
+    ('genre_title.csv', Title.genre.through),
+    ('review.csv', Review),
+    ('comments.csv', Comment),
+)
+
+
+def read_csv(filename):
+    with open(DATA_DIR / filename, encoding='utf-8', newline='') as csv_file:
+        return list(csv.DictReader(csv_file))
+
+
+def import_csv(*args):
+    out = StringIO()
+    call_command('import_csv', *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ImportCsv:
+
+    def test_01_imports_static_data(self):
+        output = import_csv('--batch-size', '7')
+        for filename, model in FILES:
+            rows = read_csv(filename)
+            assert model.objects.count() == len(rows), (
+                f'Из `{filename}` должны загрузиться все строки.'
+            )
+            assert f'{filename}: {len(rows)} строк' in output
+
+        row = read_csv('review.csv')[0]
+        review = Review.objects.get(pk=row['id'])
+        assert review.pub_date == datetime.fromisoformat(
+            row['pub_date'].replace('Z', '+00:00')
+        ).astimezone(timezone.utc), (
+            'Импорт должен сохранять дату публикации из CSV.'
+        )
+
+        title = Title.objects.get(pk=1)
+        assert title.name_search == normalize_search_text(title.name)
+        with connection.cursor() as cursor:
+            cursor.execute(TITLE_FTS_MATCH_SQL, ['Шоушенка'])
+            assert [row[0] for row in cursor.fetchall()] == [1], (
+                'Импортированные произведения должны попадать '
+                'в поисковый индекс.'
+            )
+
+        expected = {
+            item['title_id']: (item['total'], item['count'])
+            for item in Review.objects.order_by().values('title_id').annotate(
+                total=Sum('score'), count=Count('id')
+            )
+        }
+        for pk, rating_sum, rating_count in Title.objects.values_list(
+                'pk', 'rating_sum', 'rating_count'):
+            assert (rating_sum, rating_count) == expected.get(pk, (0, 0)), (
+                'После импорта рейтинги произведений должны быть '
+                'пересчитаны.'
+            )
+
+    def test_02_rerun_conflicts(self):
+        import_csv()
+        counts = {model: model.objects.count() for _, model in FILES}
+        with pytest.raises(CommandError) as error:
+            import_csv()
+        assert 'users.csv' in str(error.value)
+        assert '--ignore-conflicts' in str(error.value), (
+            'Ошибка повторного импорта должна подсказывать '
+            '`--ignore-conflicts`.'
+        )
+
+        output = import_csv('--ignore-conflicts')
+        for filename, model in FILES:
+            assert model.objects.count() == counts[model]
+            rows = len(read_csv(filename))
+            assert f'{filename}: 0 строк' in output, (
+                'Строки, пропущенные из-за конфликтов, не должны '
+                'считаться загруженными.'
+            )
+            assert f'пропущено {rows}' in output
@@ -0,0 +1,112 @@
+import csv
+import json
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.http import StreamingHttpResponse
+
+from tests.utils import create_comments
+
+
+def read_stream(response):
+    assert isinstance(response, StreamingHttpResponse), (
+        'Выгрузка должна отдаваться потоком (StreamingHttpResponse).'
+    )
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22Export:
+
+    URL = '/api/v1/export/{}/'
+    NAMES = ('titles', 'reviews', 'comments')
+
+    def create_data(self, admin_client, admin, moderator, user,
+                    moderator_client, user_client):
+        authors_map = {admin: admin_client, moderator: moderator_client,
+                       user: user_client}
+        return create_comments(admin_client, authors_map)
+
+    def test_01_admin_only(self, client, user_client, moderator_client):
+        for name in self.NAMES:
+            url = self.URL.format(name)
+            assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+            for role_client in (user_client, moderator_client):
+                assert role_client.get(url).status_code == (
+                    HTTPStatus.FORBIDDEN
+                ), f'Выгрузка `{url}` должна быть доступна только админу.'
+
+    def test_02_ndjson(self, admin_client, admin, moderator, user,
+                       moderator_client, user_client):
+        comments, reviews, titles = self.create_data(
+            admin_client, admin, moderator, user, moderator_client,
+            user_client
+        )
+        response = admin_client.get(self.URL.format('titles'))
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('application/x-ndjson')
+        assert 'titles.ndjson' in response['Content-Disposition']
+        rows = [json.loads(line)
+                for line in read_stream(response).splitlines()]
+        assert [row['id'] for row in rows] == [
+            title['id'] for title in titles
+        ]
+        assert set(rows[0]) == {'id', 'name', 'year', 'description',
+                                'genre', 'category', 'rating'}
+        assert rows[0]['genre'] == sorted(titles[0]['genre'])
+        assert rows[0]['category'] == titles[0]['category']
+        assert rows[0]['rating'] == 5
+        assert rows[1]['rating'] is None, (
+            'У произведения без отзывов рейтинг в выгрузке - null.'
+        )
+
+        response = admin_client.get(self.URL.format('reviews'))
+        rows = [json.loads(line)
+                for line in read_stream(response).splitlines()]
+        assert [(row['id'], row['author'], row['score']) for row in rows] == [
+            (review['id'], review['author'], review['score'])
+            for review in reviews
+        ]
+        assert all(row['title'] == titles[0]['id'] for row in rows)
+
+        response = admin_client.get(self.URL.format('comments'))
+        rows = [json.loads(line)
+                for line in read_stream(response).splitlines()]
+        assert [(row['id'], row['text']) for row in rows] == [
+            (comment['id'], comment['text']) for comment in comments
+        ]
+        assert all(row['review'] == reviews[0]['id'] for row in rows)
+
+    def test_03_csv(self, admin_client, admin, moderator, user,
+                    moderator_client, user_client):
+        _, _, titles = self.create_data(
+            admin_client, admin, moderator, user, moderator_client,
+            user_client
+        )
+        response = admin_client.get(self.URL.format('titles'),
+                                    {'output': 'csv'})
+        assert response.status_code == HTTPStatus.OK
+        assert response['Content-Type'].startswith('text/csv')
+        assert 'titles.csv' in response['Content-Disposition']
+        rows = list(csv.DictReader(StringIO(read_stream(response))))
+        assert list(rows[0]) == ['id', 'name', 'year', 'description',
+                                 'genre', 'category', 'rating']
+        assert rows[0]['genre'] == ','.join(sorted(titles[0]['genre'])), (
+            'Жанры в CSV-выгрузке перечисляются через запятую.'
+        )
+        assert float(rows[0]['rating']) == 5
+        assert rows[1]['rating'] == ''
+
+        response = admin_client.get(self.URL.format('comments'),
+                                    {'output': 'csv'})
+        rows = list(csv.DictReader(StringIO(read_stream(response))))
+        assert list(rows[0]) == ['id', 'title', 'review', 'author', 'text',
+                                 'pub_date']
+        assert len(rows) == 3
+
+    def test_04_unknown_output(self, admin_client):
+        response = admin_client.get(self.URL.format('titles'),
+                                    {'output': 'xml'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'output' in response.json()